@@ -1,8 +1,8 @@
 import re
 
-from aocd.models import Puzzle
+from inputs import LazyPuzzle
 
-puzzle = Puzzle(year=2018, day=25)
+puzzle = LazyPuzzle(year=2018, day=25)
 
 
 def parse(input_data):
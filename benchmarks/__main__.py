@@ -0,0 +1,106 @@
+import argparse
+import csv
+import math
+import random
+from multiprocessing import Pipe, Process
+
+import inputs
+import runner
+from benchmarks.generators import GENERATORS
+
+
+def fit_exponent(points):
+    """Slope of log(time) over log(size), 1 means linear, 2 quadratic."""
+    points = [(math.log(size), math.log(wall)) for size, wall in points if wall > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    if var == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+
+def run_and_send(connection, task, input_data):
+    runner.init_worker()
+    connection.send(runner.run_part(task, input_data))
+
+
+def run_case(task, input_data, timeout):
+    # one process per case, so a hanging solution can be dropped and RSS is not shared
+    receiver, sender = Pipe(duplex=False)
+    process = Process(target=run_and_send, args=(sender, task, input_data))
+    process.start()
+    result = receiver.recv() if receiver.poll(timeout) else None
+    process.terminate()
+    process.join()
+    return result
+
+
+def benchmark(days, sizes, parts, timeout, seed):
+    results = []
+    for day in runner.find_days():
+        if (days and day not in days) or day not in GENERATORS:
+            continue
+        generator, default_sizes = GENERATORS[day]
+        tasks = runner.collect_tasks({day}, parts)
+        for size in sizes or default_sizes:
+            input_data = generator(size, random.Random(seed))
+            for task in tasks:
+                result = run_case(task, input_data, timeout)
+                if result is None:
+                    result = {'day': day, 'part': task[2], 'error': f"timeout after {timeout}s"}
+                result['size'] = size
+                results.append(result)
+                print_result(result)
+    return results
+
+
+def print_result(r):
+    if r['error'] is not None:
+        print(f"{r['day']:>3} {r['part']:>4} {r['size']:>9}  {r['error']}")
+    else:
+        print(f"{r['day']:>3} {r['part']:>4} {r['size']:>9} {r['wall']:>10.3f} {r['cpu']:>10.3f} {r['rss']:>9.1f}")
+
+
+def print_curves(results):
+    curves = {}
+    for r in results:
+        if r['error'] is None:
+            curves.setdefault((r['day'], r['part']), []).append((r['size'], r['wall']))
+    print()
+    print(f"{'day':>3} {'part':>4} {'exponent':>9}")
+    for (day, part), points in sorted(curves.items()):
+        exponent = fit_exponent(points)
+        print(f"{day:>3} {part:>4} {'-' if exponent is None else f'{exponent:.2f}':>9}")
+
+
+def save(results, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["day", "part", "size", "wall", "cpu", "rss", "error"])
+        for r in results:
+            writer.writerow([r['day'], r['part'], r['size'], r.get('wall'), r.get('cpu'), r.get('rss'), r['error']])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the 2018 solutions on generated inputs of growing size")
+    parser.add_argument("days", nargs="*", type=int, help="days to run, all when empty")
+    parser.add_argument("--sizes", nargs="+", type=int, help="input sizes, each day has its own defaults")
+    parser.add_argument("--parts", default="ab", help="parts to run, e.g. 'a' or 'ab'")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds after which a case is dropped")
+    parser.add_argument("--seed", type=int, default=2018)
+    parser.add_argument("--output", help="csv file for the time-vs-size curves")
+    args = parser.parse_args()
+
+    inputs.SUBMIT = False
+    print(f"{'day':>3} {'part':>4} {'size':>9} {'wall [s]':>10} {'cpu [s]':>10} {'rss [MB]':>9}")
+    results = benchmark(set(args.days), args.sizes, args.parts, args.timeout, args.seed)
+    print_curves(results)
+    if args.output:
+        save(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,356 @@
+import itertools
+import operator
+import string
+from datetime import datetime, timedelta
+
+# Every generator takes the size and a random.Random and returns the puzzle input as a string.
+
+
+def frequencies(size, rng):
+    deltas = [rng.choice([-1, 1]) * rng.randint(1, 100) for _ in range(size - 1)]
+    prefix, low, high = 0, 0, 0
+    for delta in deltas:
+        prefix += delta
+        low, high = min(low, prefix), max(high, prefix)
+    # a small total drift keeps the number of passes in part 2 around ten
+    drift = max(1, (high - low) // 10)
+    deltas.append(drift - prefix)
+    return "\n".join(f"{d:+d}" for d in deltas)
+
+
+def box_ids(size, rng, length=26):
+    ids = [''.join(rng.choice(string.ascii_lowercase) for _ in range(length)) for _ in range(size - 1)]
+    twin = list(rng.choice(ids))
+    pos = rng.randrange(length)
+    twin[pos] = string.ascii_lowercase[(string.ascii_lowercase.index(twin[pos]) + 1) % 26]
+    ids.insert(rng.randrange(len(ids) + 1), ''.join(twin))
+    return "\n".join(ids)
+
+
+def claims(size, rng, fabric=1000):
+    lines = []
+    isolated = rng.randrange(size)
+    for claim_id in range(1, size + 1):
+        w, h = rng.randint(5, 30), rng.randint(5, 30)
+        if claim_id - 1 == isolated:
+            x, y = fabric + 10, fabric + 10
+        else:
+            x, y = rng.randrange(fabric - w), rng.randrange(fabric - h)
+        lines.append(f"#{claim_id} @ {x},{y}: {w}x{h}")
+    return "\n".join(lines)
+
+
+def guard_log(size, rng):
+    lines = []
+    guards = [rng.randint(10, 3500) for _ in range(max(2, size // 20))]
+    day = datetime(1518, 1, 1)
+    for _ in range(size):
+        start = day - timedelta(minutes=rng.randint(0, 10))
+        lines.append(f"[{start:%Y-%m-%d %H:%M}] Guard #{rng.choice(guards)} begins shift")
+        minute = rng.randint(0, 10)
+        while minute < 50:
+            sleep = rng.randint(minute + 1, 55)
+            wake = rng.randint(sleep + 1, 59)
+            lines.append(f"[{day:%Y-%m-%d} 00:{sleep:02d}] falls asleep")
+            lines.append(f"[{day:%Y-%m-%d} 00:{wake:02d}] wakes up")
+            minute = wake + rng.randint(1, 20)
+        day += timedelta(days=1)
+    rng.shuffle(lines)
+    return "\n".join(lines)
+
+
+def polymer(size, rng, units=string.ascii_lowercase):
+    return ''.join(rng.choice(units).swapcase() if rng.random() < 0.5 else rng.choice(units) for _ in range(size))
+
+
+def coordinates(size, rng):
+    span = max(300, int(size ** 0.5 * 40))
+    points = set()
+    while len(points) < size:
+        points.add((rng.randint(40, 40 + span), rng.randint(40, 40 + span)))
+    return "\n".join(f"{x}, {y}" for x, y in points)
+
+
+def step_names(size):
+    length = 1
+    while len(string.ascii_uppercase) ** length < size:
+        length += 1
+    names = itertools.product(string.ascii_uppercase, repeat=length)
+    return [''.join(name) for name in itertools.islice(names, size)]
+
+
+def dependencies(size, rng):
+    names = step_names(size)
+    rng.shuffle(names)
+    lines = []
+    for idx in range(1, len(names)):
+        for before in set(rng.randrange(idx) for _ in range(rng.randint(1, 3))):
+            lines.append(f"Step {names[before]} must be finished before step {names[idx]} can begin.")
+    rng.shuffle(lines)
+    return "\n".join(lines)
+
+
+def license_tree(size, rng):
+    children = [[] for _ in range(size)]
+    for node in range(1, size):
+        children[rng.randrange(node)].append(node)
+    metadata = [rng.randint(1, 3) for _ in range(size)]
+    tokens = []
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        if node < 0:
+            # metadata entries of ~node go after all of its children
+            node = ~node
+            tokens.extend(rng.randint(1, max(9, len(children[node]) + 1)) for _ in range(metadata[node]))
+            continue
+        tokens.extend([len(children[node]), metadata[node]])
+        stack.append(~node)
+        stack.extend(reversed(children[node]))
+    return " ".join(map(str, tokens))
+
+
+def marbles(size, rng):
+    return f"{rng.randint(10, 450)} players; last marble is worth {size} points"
+
+
+LETTERS = {
+    'E': ["######", "#.....", "#.....", "#####.", "#.....", "#.....", "#.....", "######"],
+    'H': ["#....#", "#....#", "#....#", "######", "#....#", "#....#", "#....#", "#....#"],
+    'L': ["#.....", "#.....", "#.....", "#.....", "#.....", "#.....", "#.....", "######"],
+    'T': ["######", "..#...", "..#...", "..#...", "..#...", "..#...", "..#...", "..#..."],
+}
+
+
+def star_message(size, rng, seconds=10000):
+    letters = ''.join(rng.choice(list(LETTERS)) for _ in range(max(1, size // 25)))
+    targets = []
+    for idx, letter in enumerate(letters):
+        for y, row in enumerate(LETTERS[letter]):
+            for x, cell in enumerate(row):
+                if cell == '#':
+                    targets.append((idx * 8 + x, y))
+    lines = []
+    for x, y in targets:
+        vx, vy = rng.randint(-5, 5), rng.randint(-5, 5)
+        lines.append(f"position=<{x - vx * seconds:6d}, {y - vy * seconds:6d}> velocity=<{vx:2d}, {vy:2d}>")
+    rng.shuffle(lines)
+    return "\n".join(lines)
+
+
+def serial_number(size, rng):
+    # the grid is fixed at 300x300, only the serial number changes
+    return str(rng.randint(1, 9999))
+
+
+def pots(size, rng):
+    initial = ''.join(rng.choice('#.') for _ in range(size))
+    rules = ['...##', '..#..', '.#...', '.#.#.', '.#.##', '.##..', '.####',
+             '#.#.#', '#.###', '##.#.', '##.##', '###..', '###.#', '####.']
+    return f"initial state: {initial}\n\n" + "\n".join(f"{rule} => #" for rule in rules)
+
+
+def tracks(size, rng, cell=12):
+    columns = max(1, int(size ** 0.5))
+    rows = (size + columns - 1) // columns
+    grid = [[' '] * (columns * cell) for _ in range(rows * cell)]
+    lonely = rng.randrange(size)
+    for loop in range(size):
+        top, left = loop // columns * cell, loop % columns * cell
+        h, w = rng.randint(4, cell - 2), rng.randint(5, cell - 2)
+        bottom, right = top + h, left + w
+        for x in range(left + 1, right):
+            grid[top][x] = grid[bottom][x] = '-'
+        for y in range(top + 1, bottom):
+            grid[y][left] = grid[y][right] = '|'
+        grid[top][left] = grid[bottom][right] = '/'
+        grid[top][right] = grid[bottom][left] = '\\'
+        grid[top][left + 1] = '>'
+        if loop != lonely:
+            grid[top][right - 1] = '<'
+    return "\n".join(''.join(row) for row in grid)
+
+
+def recipes(size, rng):
+    return str(size)
+
+
+def cave(size, rng, pillars=0.3):
+    board = [['#'] * size for _ in range(size)]
+    open_cells = []
+    for y in range(1, size - 1):
+        for x in range(1, size - 1):
+            # walls only on even/even cells so that the cave stays connected
+            if y % 2 == 0 and x % 2 == 0 and rng.random() < pillars:
+                continue
+            board[y][x] = '.'
+            open_cells.append((y, x))
+    units = rng.sample(open_cells, min(len(open_cells), max(2, size // 2)))
+    for idx, (y, x) in enumerate(units):
+        board[y][x] = 'EG'[idx % 2]
+    return "\n".join(''.join(row) for row in board)
+
+
+OPERATIONS = ['addr', 'addi', 'mulr', 'muli', 'banr', 'bani', 'borr', 'bori',
+              'setr', 'seti', 'gtir', 'gtri', 'gtrr', 'eqir', 'eqri', 'eqrr']
+ARITHMETIC = {'add': operator.add, 'mul': operator.mul, 'ban': operator.and_, 'bor': operator.or_}
+
+
+def execute(name, reg, a, b, c):
+    reg = list(reg)
+    if name in ('setr', 'seti'):
+        reg[c] = reg[a] if name == 'setr' else a
+    elif name[:2] in ('gt', 'eq'):
+        left = a if name[2] == 'i' else reg[a]
+        right = b if name[3] == 'i' else reg[b]
+        reg[c] = int(left > right if name[:2] == 'gt' else left == right)
+    else:
+        right = b if name[3] == 'i' else reg[b]
+        reg[c] = ARITHMETIC[name[:3]](reg[a], right)
+    return reg
+
+
+def observations(size, rng):
+    codes = list(range(16))
+    rng.shuffle(codes)
+    samples = []
+    for idx in range(max(size, 200)):
+        code = idx % 16
+        a, b, c = rng.randrange(4), rng.randrange(4), rng.randrange(4)
+        before = [rng.randrange(4) for _ in range(4)]
+        after = execute(OPERATIONS[code], before, a, b, c)
+        samples.append(f"Before: {before}\n{codes[code]} {a} {b} {c}\nAfter:  {after}")
+    program = [f"{rng.randrange(16)} {rng.randrange(4)} {rng.randrange(4)} {rng.randrange(4)}" for _ in range(size)]
+    return "\n\n".join(samples) + "\n\n\n\n" + "\n".join(program)
+
+
+def clay(size, rng):
+    lines = []
+    width = max(40, size * 4)
+    for _ in range(size):
+        left = 500 + rng.randint(-width // 2, width // 2)
+        right = left + rng.randint(3, 12)
+        top = rng.randint(1, size * 5)
+        bottom = top + rng.randint(3, 10)
+        lines.append(f"x={left}, y={top}..{bottom}")
+        lines.append(f"x={right}, y={top}..{bottom}")
+        lines.append(f"y={bottom}, x={left}..{right}")
+    return "\n".join(lines)
+
+
+def lumber(size, rng):
+    return "\n".join(''.join(rng.choice('..|#') for _ in range(size)) for _ in range(size))
+
+
+def divisor_program(size, rng):
+    # same shape as the puzzle input: part 1 sums the divisors of size, part 2 of a much larger number
+    return "\n".join([
+        "#ip 5",
+        "addi 5 16 5", "seti 1 1 1", "seti 1 4 2", "mulr 1 2 4", "eqrr 4 3 4", "addr 4 5 5",
+        "addi 5 1 5", "addr 1 0 0", "addi 2 1 2", "gtrr 2 3 4", "addr 5 4 5", "seti 2 7 5",
+        "addi 1 1 1", "gtrr 1 3 4", "addr 4 5 5", "seti 1 2 5", "mulr 5 5 5",
+        f"seti {size} 0 3", "addr 5 0 5", "seti 0 0 5",
+        f"seti {size * 1000 + rng.randint(0, 999)} 0 4", "addr 3 4 3", "seti 0 0 0", "seti 0 0 5",
+    ])
+
+
+def regex_path(size, rng):
+    def branch(budget, depth):
+        result = []
+        while budget > 0:
+            if depth < 8 and budget > 6 and rng.random() < 0.15:
+                options = rng.randint(2, 3)
+                parts = [branch(budget // (options * 2), depth + 1) for _ in range(options)]
+                if rng.random() < 0.3:
+                    parts.append('')
+                result.append('(' + '|'.join(parts) + ')')
+                budget //= 2
+            else:
+                result.append(rng.choice('NEWS'))
+                budget -= 1
+        return ''.join(result)
+
+    return '^' + branch(size, 0) + '$'
+
+
+def hash_program(size, rng):
+    # the puzzle program, only the seed of the hash changes
+    return "\n".join([
+        "#ip 2",
+        "seti 123 0 1", "bani 1 456 1", "eqri 1 72 1", "addr 1 2 2", "seti 0 0 2", "seti 0 6 1",
+        "bori 1 65536 4", f"seti {rng.randint(1, 16777215)} 3 1", "bani 4 255 5", "addr 1 5 1",
+        "bani 1 16777215 1", "muli 1 65899 1", "bani 1 16777215 1", "gtir 256 4 5", "addr 5 2 2",
+        "addi 2 1 2", "seti 27 4 2", "seti 0 2 5", "addi 5 1 3", "muli 3 256 3", "gtrr 3 4 3",
+        "addr 3 2 2", "addi 2 1 2", "seti 25 3 2", "addi 5 1 5", "seti 17 1 2", "setr 5 2 4",
+        "seti 7 3 2", "eqrr 1 0 5", "addr 5 2 2", "seti 5 3 2",
+    ])
+
+
+def cave_system(size, rng):
+    return f"depth: {rng.randint(3000, 11000)}\ntarget: {size // 4},{size}"
+
+
+def nanobots(size, rng, span=10 ** 8):
+    lines = []
+    for _ in range(size):
+        x, y, z = (rng.randint(-span, span) for _ in range(3))
+        lines.append(f"pos=<{x},{y},{z}>, r={rng.randint(span // 20, span // 2)}")
+    return "\n".join(lines)
+
+
+DAMAGE_TYPES = ['bludgeoning', 'cold', 'fire', 'radiation', 'slashing']
+
+
+def armies(size, rng):
+    initiatives = list(range(1, 2 * size + 1))
+    rng.shuffle(initiatives)
+    text = []
+    for army in ["Immune System", "Infection"]:
+        lines = [f"{army}:"]
+        for _ in range(size):
+            kinds = rng.sample(DAMAGE_TYPES, rng.randint(0, 3))
+            split = rng.randint(0, len(kinds))
+            traits = []
+            if kinds[:split]:
+                traits.append(f"weak to {', '.join(kinds[:split])}")
+            if kinds[split:]:
+                traits.append(f"immune to {', '.join(kinds[split:])}")
+            hardiness = f"({'; '.join(traits)}) " if traits else ""
+            lines.append(f"{rng.randint(10, 5000)} units each with {rng.randint(500, 10000)} hit points "
+                         f"{hardiness}with an attack that does {rng.randint(5, 200)} {rng.choice(DAMAGE_TYPES)} "
+                         f"damage at initiative {initiatives.pop()}")
+        text.append("\n".join(lines))
+    return "\n\n".join(text)
+
+
+def spacetime_points(size, rng):
+    return "\n".join(','.join(str(rng.randint(-8, 8)) for _ in range(4)) for _ in range(size))
+
+
+GENERATORS = {
+    1: (frequencies, [1000, 10000, 100000]),
+    2: (box_ids, [250, 1000, 4000]),
+    3: (claims, [250, 1000, 4000]),
+    4: (guard_log, [100, 1000, 10000]),
+    5: (polymer, [1000, 10000, 50000]),
+    6: (coordinates, [10, 50, 100]),
+    7: (dependencies, [1000, 10000, 100000]),
+    8: (license_tree, [1000, 10000, 100000]),
+    9: (marbles, [1000, 10000, 100000]),
+    10: (star_message, [100, 300, 1000]),
+    11: (serial_number, [300]),
+    12: (pots, [50, 100, 200]),
+    13: (tracks, [4, 16, 64]),
+    14: (recipes, [1000, 10000, 100000]),
+    15: (cave, [8, 16, 32]),
+    16: (observations, [250, 1000, 4000]),
+    17: (clay, [10, 50, 200]),
+    18: (lumber, [10, 25, 50]),
+    19: (divisor_program, [100, 300, 1000]),
+    20: (regex_path, [1000, 10000, 50000]),
+    21: (hash_program, [1]),
+    22: (cave_system, [10, 50, 200]),
+    23: (nanobots, [100, 1000, 5000]),
+    24: (armies, [5, 10, 20]),
+    25: (spacetime_points, [100, 1000, 3000]),
+}
@@ -2,9 +2,9 @@ import abc
 import heapq
 from typing import List, cast, Type
 
-from aocd.models import Puzzle
+from inputs import LazyPuzzle
 
-puzzle = Puzzle(year=2018, day=15)
+puzzle = LazyPuzzle(year=2018, day=15)
 
 NEIGHBOURS = [
     (-1, 0),
@@ -1,6 +1,7 @@
-from aocd.models import Puzzle
+from elfcode import OPERATIONS as operations, Computer, Opcode
+from inputs import LazyPuzzle
 
-puzzle = Puzzle(year=2018, day=16)
+puzzle = LazyPuzzle(year=2018, day=16)
 
 
 def parse(input_data):
@@ -18,81 +19,6 @@ def parse(input_data):
     return parsed_observations, parsed_program
 
 
-def addr(reg, a, b, c):
-    reg[c] = reg[a] + reg[b]
-
-
-def addi(reg, a, b, c):
-    reg[c] = reg[a] + b
-
-
-def mulr(reg, a, b, c):
-    reg[c] = reg[a] * reg[b]
-
-
-def muli(reg, a, b, c):
-    reg[c] = reg[a] * b
-
-
-def banr(reg, a, b, c):
-    reg[c] = reg[a] & reg[b]
-
-
-def bani(reg, a, b, c):
-    reg[c] = reg[a] & b
-
-
-def borr(reg, a, b, c):
-    reg[c] = reg[a] | reg[b]
-
-
-def bori(reg, a, b, c):
-    reg[c] = reg[a] | b
-
-
-def setr(reg, a, b, c):
-    reg[c] = reg[a]
-
-
-def seti(reg, a, b, c):
-    reg[c] = a
-
-
-def gtir(reg, a, b, c):
-    reg[c] = 1 if a > reg[b] else 0
-
-
-def gtri(reg, a, b, c):
-    reg[c] = 1 if reg[a] > b else 0
-
-
-def gtrr(reg, a, b, c):
-    reg[c] = 1 if reg[a] > reg[b] else 0
-
-
-def eqir(reg, a, b, c):
-    reg[c] = 1 if a == reg[b] else 0
-
-
-def eqri(reg, a, b, c):
-    reg[c] = 1 if reg[a] == b else 0
-
-
-def eqrr(reg, a, b, c):
-    reg[c] = 1 if reg[a] == reg[b] else 0
-
-
-operations = [
-    addr, addi,
-    mulr, muli,
-    banr, bani,
-    borr, bori,
-    setr, seti,
-    gtir, gtri, gtrr,
-    eqir, eqri, eqrr
-]
-
-
 def part1(input_data):
     observations, _ = parse(input_data)
     result = 0
@@ -126,10 +52,9 @@ def part2(input_data):
             if len(matches) == 1:
                 mapping[code] = matches[0]
     print(f"Mapping found: {mapping}")
+    program = [(Opcode(operations[mapping[code]].__name__), a, b, c) for code, a, b, c in program]
     reg = [0, 0, 0, 0]
-    for code, a, b, c in program:
-        operation = operations[mapping[code]]
-        operation(reg, a, b, c)
+    Computer(program, None, registers=4).run(reg)
     return reg[0]
 
 
@@ -1,6 +1,6 @@
-from aocd.models import Puzzle
+from inputs import LazyPuzzle
 
-puzzle = Puzzle(year=2018, day=17)
+puzzle = LazyPuzzle(year=2018, day=17)
 
 
 def parse(input_data):
@@ -1,9 +1,9 @@
 from collections import Counter
 from functools import reduce
 
-from aocd.models import Puzzle
+from inputs import LazyPuzzle
 
-puzzle = Puzzle(year=2018, day=18)
+puzzle = LazyPuzzle(year=2018, day=18)
 
 
 def parse(input_data):
@@ -2,9 +2,9 @@ import abc
 from collections import defaultdict, deque
 from typing import cast
 
-from aocd.models import Puzzle
+from inputs import LazyPuzzle
 
-puzzle = Puzzle(year=2018, day=20)
+puzzle = LazyPuzzle(year=2018, day=20)
 
 
 class Term(abc.ABC):
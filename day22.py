@@ -4,9 +4,9 @@ import re
 from collections import deque, defaultdict
 from functools import cache
 
-from aocd.models import Puzzle
+from inputs import LazyPuzzle
 
-puzzle = Puzzle(year=2018, day=22)
+puzzle = LazyPuzzle(year=2018, day=22)
 
 
 def parse(input_data):
@@ -1,9 +1,9 @@
 import re
 
-from aocd.models import Puzzle
+from inputs import LazyPuzzle
 from z3 import Real, Solver, Optimize, If
 
-puzzle = Puzzle(year=2018, day=23)
+puzzle = LazyPuzzle(year=2018, day=23)
 
 
 def parse(input_data):
@@ -3,10 +3,10 @@ from collections import defaultdict
 from copy import copy
 from functools import cmp_to_key, reduce
 
-from aocd.models import Puzzle
+from inputs import LazyPuzzle
 from tqdm import tqdm
 
-puzzle = Puzzle(year=2018, day=24)
+puzzle = LazyPuzzle(year=2018, day=24)
 
 
 class Group:
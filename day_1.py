@@ -1,26 +1,83 @@
-from aocd.models import Puzzle
+import mmap
 
-puzzle = Puzzle(year=2018, day=1)
+import numpy as np
+
+from inputs import LazyPuzzle
+
+puzzle = LazyPuzzle(year=2018, day=1)
+
+
+def parse_changes(data):
+    """Signed integers of a bytes-like buffer (bytes, mmap, ...) as an int64 array, without splitting it."""
+    if isinstance(data, str):
+        data = data.encode()
+    chars = np.frombuffer(data, dtype=np.uint8)
+    digits = (chars >= ord('0')) & (chars <= ord('9'))
+    padded = np.concatenate(([False], digits, [False]))
+    starts = np.flatnonzero(padded[1:-1] & ~padded[:-2])
+    ends = np.flatnonzero(padded[1:-1] & ~padded[2:])
+    lengths = ends - starts
+    values = np.zeros(len(starts), dtype=np.int64)
+    for k in range(int(lengths.max(initial=-1)) + 1):
+        # k-th digit from the right of every number at once, zero for numbers shorter than that
+        digit = (chars[ends - np.minimum(lengths, k)] - ord('0')) * (lengths >= k)
+        values += digit * np.int64(10 ** k)
+    negative = chars[np.maximum(starts - 1, 0)] == ord('-')
+    negative &= starts > 0
+    return np.where(negative, -values, values)
+
+
+def load_changes(path):
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return parse_changes(data)
 
 
 def part1():
-    puzzle.answer_a = sum(map(int, puzzle.input_data.split()))
+    puzzle.answer_a = int(parse_changes(puzzle.input_data).sum())
 
 
-def part2():
+def simulate_first_repeat(freq_list):
     frequencies = set()
     current_freq = 0
-    freq_list = list(map(int , puzzle.input_data.split()))
     current_freq_idx = 0
     while True:
         next_freq = freq_list[current_freq_idx % len(freq_list)]
         current_freq_idx += 1
         current_freq += next_freq
         if current_freq in frequencies:
-            ans = current_freq
-            break
+            return current_freq
         frequencies.add(current_freq)
-    puzzle.answer_b = ans
+
+
+def first_repeat(freq_list):
+    """Same answer as simulate_first_repeat in O(n log n), without running the passes.
+
+    Pass k reaches prefix sum S[i] + k * T, so S[i] repeats once it has climbed to a larger S[j]
+    of the same residue modulo T. The earliest repeat is the smallest (k, i) over those pairs."""
+    sums = np.cumsum(np.asarray(freq_list, dtype=np.int64))
+    order = np.argsort(sums, kind='stable')
+    repeated = order[1:][sums[order[1:]] == sums[order[:-1]]]
+    if len(repeated):
+        return int(sums[repeated.min()])
+    shift = int(sums[-1])
+    if shift == 0:
+        return int(sums[0])
+    values = sums if shift > 0 else -sums
+    step = abs(shift)
+    residues = values % step
+    order = np.lexsort((values, residues))
+    low, high = order[:-1], order[1:]
+    same = residues[low] == residues[high]
+    low, high = low[same], high[same]
+    if not len(low):
+        raise ValueError("frequency never repeats")
+    passes = (values[high] - values[low]) // step
+    best = np.lexsort((low, passes))[0]
+    return int(sums[high[best]])
+
+
+def part2():
+    puzzle.answer_b = first_repeat(parse_changes(puzzle.input_data))
 
 
 if __name__ == '__main__':
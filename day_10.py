@@ -2,10 +2,9 @@ import re
 
 import pytesseract
 from PIL import Image, ImageDraw
-from aocd.models import Puzzle
+from inputs import LazyPuzzle
 
-puzzle = Puzzle(year=2018, day=10)
-raw = puzzle.input_data
+puzzle = LazyPuzzle(year=2018, day=10)
 
 
 # raw = """position=< 9,  1> velocity=< 0,  2>
@@ -94,7 +93,7 @@ def print_points(points):
 
 
 def solve():
-    points = parse_points(raw)
+    points = parse_points(puzzle.input_data)
     second = 0
     while True:
         img = print_points(points)
@@ -1,7 +1,10 @@
-from aocd.models import Puzzle
+from collections import OrderedDict
 
-puzzle = Puzzle(year=2018, day=11)
-raw = puzzle.input_data
+import numpy as np
+
+from inputs import LazyPuzzle
+
+puzzle = LazyPuzzle(year=2018, day=11)
 
 
 def one_cell_power(x, y, serial_number):
@@ -13,67 +16,146 @@ def one_cell_power(x, y, serial_number):
     return power_lvl - 5
 
 
+def power_grid(serial_number, grid_size=300):
+    # same formula as one_cell_power for every cell at once, indexed [x - 1, y - 1]
+    x = np.arange(1, grid_size + 1).reshape(-1, 1)
+    y = np.arange(1, grid_size + 1).reshape(1, -1)
+    rack_id = x + 10
+    power_lvl = (rack_id * y + serial_number) * rack_id
+    return power_lvl // 100 % 10 - 5
+
+
+def square_sums(tables, square_size):
+    # sums[..., x, y] is the total power of the square with its top-left corner at (x + 1, y + 1)
+    t = tables
+    k = square_size
+    return t[..., k:, k:] - t[..., :-k, k:] - t[..., k:, :-k] + t[..., :-k, :-k]
+
+
+def best_squares(tables, square_size):
+    """Best square of the given size in each of the stacked tables, as arrays of x, y and total power."""
+    sums = square_sums(tables, square_size)
+    flat = sums.reshape(sums.shape[0], -1)
+    best = flat.argmax(axis=1)
+    x, y = np.unravel_index(best, sums.shape[1:])
+    return x + 1, y + 1, flat[np.arange(len(best)), best]
+
+
+class SummedAreaTable:
+    def __init__(self, table):
+        self.size = table.shape[0] - 1
+        self.table = table
+
+    @staticmethod
+    def from_grids(grids):
+        # |power| <= 5, so int32 holds the sums of grids up to 20000 cells wide
+        tables = np.zeros((grids.shape[0], grids.shape[1] + 1, grids.shape[2] + 1), dtype=np.int32)
+        tables[:, 1:, 1:] = grids.cumsum(axis=1, dtype=np.int32).cumsum(axis=2)
+        return [SummedAreaTable(table) for table in tables]
+
+    @staticmethod
+    def for_serial(serial_number, grid_size=300):
+        return SummedAreaTable.from_grids(power_grid(serial_number, grid_size)[np.newaxis])[0]
+
+    def square_sums(self, square_size):
+        return square_sums(self.table, square_size)
+
+    def best_square(self, square_size):
+        x, y, total = best_squares(self.table[np.newaxis], square_size)
+        return int(x[0]), int(y[0]), int(total[0])
+
+    def search(self):
+        """Best 3x3 square as (x, y) and best square of any size as (x, y, size, total), in one pass over the sizes.
+
+        A cell has at most 4 power and a square of size k holds (k // m)² disjoint squares of size m, so
+        sizes whose bound from a smaller size cannot beat the best square so far are skipped."""
+        t = self.table
+        buffer = np.empty(self.size * self.size, dtype=t.dtype)
+        part_1 = best = None
+        bounds = {}
+        for k in range(1, self.size + 1):
+            bound = 4 * k * k
+            for m in {k // 2, k // 3, k // 4} - {0}:
+                q = k // m
+                bound = min(bound, q * q * bounds[m] + 4 * (k * k - (q * m) ** 2))
+            if best is not None and bound <= best[3] and k != 3:
+                bounds[k] = bound
+                continue
+            n = self.size - k + 1
+            sums = buffer[:n * n].reshape(n, n)
+            np.subtract(t[k:, k:], t[:-k, k:], out=sums)
+            sums -= t[k:, :-k]
+            sums += t[:-k, :-k]
+            index = int(sums.argmax())
+            x, y = divmod(index, n)
+            bounds[k] = total = int(sums.flat[index])
+            if k == 3:
+                part_1 = (x + 1, y + 1)
+            if best is None or total > best[3]:
+                best = (x + 1, y + 1, k, total)
+        return part_1, best
+
+    def best_any_square(self):
+        return self.search()[1]
+
+
+class TableStore:
+    """Least recently used summed-area tables by serial number and grid size."""
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.tables = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.tables
+
+    def get(self, serial_number, grid_size=300):
+        key = (serial_number, grid_size)
+        self.tables.move_to_end(key)
+        return self.tables[key]
+
+    def put(self, serial_number, grid_size, table):
+        self.tables[(serial_number, grid_size)] = table
+        self.tables.move_to_end((serial_number, grid_size))
+        while len(self.tables) > self.capacity:
+            self.tables.popitem(last=False)
+
+    def tables_for(self, serial_numbers, grid_size=300):
+        found = {s: self.get(s, grid_size) for s in set(serial_numbers) if (s, grid_size) in self}
+        missing = [s for s in dict.fromkeys(serial_numbers) if s not in found]
+        if missing:
+            # one broadcast over all missing serial numbers instead of a grid per call
+            grids = power_grid(np.array(missing).reshape(-1, 1, 1), grid_size)
+            for serial_number, table in zip(missing, SummedAreaTable.from_grids(grids)):
+                self.put(serial_number, grid_size, table)
+                found[serial_number] = table
+        return [found[s] for s in serial_numbers]
+
+
+store = TableStore()
+
+
+def solve_serials(serial_numbers, grid_size=300):
+    """Part 1 and part 2 answers for every serial number.
+
+    The tables of all missing serial numbers are built together, but they are searched one at a time:
+    the sums of one table fit in cache, those of a whole stack do not."""
+    serial_numbers = list(dict.fromkeys(serial_numbers))
+    answers = {}
+    for serial_number, table in zip(serial_numbers, store.tables_for(serial_numbers, grid_size)):
+        part_1, (x, y, square_size, _) = table.search()
+        answers[serial_number] = (part_1, (x, y, square_size))
+    return answers
+
+
 def part_1(serial_number):
-    grid_size = 300
-    grid = {}
-    max_value = float("-inf")
-    max_position = None
-    for x in range(1, grid_size + 1):
-        for y in range(1, grid_size + 1):
-            grid[(x, y)] = one_cell_power(x, y, serial_number)
-    for x in range(1, grid_size + 1 - 3):
-        for y in range(1, grid_size + 1 - 3):
-            total_power = 0
-            for dx in range(3):
-                for dy in range(3):
-                    total_power += grid[(x + dx, y + dy)]
-            if total_power > max_value:
-                max_value = total_power
-                max_position = (x, y)
-    return max_position
-
-
-def max_sum_subarray(arr, size):
-    current_sum = 0
-    for i in range(size):
-        current_sum += arr[i]
-    max_sum = current_sum
-    max_position = 0
-    for i in range(len(arr) - size):
-        current_sum -= arr[i]
-        current_sum += arr[i + size]
-        if current_sum > max_sum:
-            max_sum = current_sum
-            max_position = i + 1
-    return max_position, max_sum
+    x, y, _ = store.tables_for([serial_number])[0].best_square(3)
+    return x, y
 
 
 def part_2(serial_number):
-    grid_size = 300
-
-    def calc_all_cells():
-        cells = [[0] * grid_size for _ in range(grid_size)]
-        for x in range(grid_size):
-            for y in range(grid_size):
-                cells[y][x] = one_cell_power(x + 1, y + 1, serial_number)
-        return cells
-
-    max_sum = -float('inf')
-    max_left = None
-    max_top = None
-    max_square_size = None
-    all_cells = calc_all_cells()
-    for left in range(grid_size):
-        for right in range(left + 1, grid_size + 1):
-            square_size = right - left
-            row_sums = [sum(all_cells[row][left: right]) for row in range(grid_size)]
-            current_pos, current_max = max_sum_subarray(row_sums, square_size)
-            if current_max > max_sum:
-                max_sum = current_max
-                max_top = current_pos
-                max_left = left
-                max_square_size = square_size
-    return max_left + 1, max_top + 1, max_square_size
+    x, y, square_size, _ = store.tables_for([serial_number])[0].best_any_square()
+    return x, y, square_size
 
 
 def solve():
@@ -85,18 +167,18 @@ def solve():
     assert part_1(18) == (33, 45)
     assert part_1(42) == (21, 61)
 
-    assert max_sum_subarray([-2, 1, -3, 4, -1, 2, 1, -5, 4], 4) == (3, 6)
-    assert max_sum_subarray([-2, -3, 4, -1, -2, 1, 5, -3], 5) == (2, 7)
-
     assert part_2(18) == (90, 269, 16)
     assert part_2(42) == (232, 251, 12)
 
-    serial_number = int(raw)
+    serial_number = int(puzzle.input_data)
+    answers = solve_serials([18, 42, serial_number])
+    assert answers[18] == ((33, 45), (90, 269, 16))
+    assert answers[42] == ((21, 61), (232, 251, 12))
 
-    ans = part_1(serial_number)
+    ans, _ = answers[serial_number]
     puzzle.answer_a = ','.join(map(str, ans))
 
-    ans = part_2(serial_number)
+    _, ans = answers[serial_number]
     puzzle.answer_b = ','.join(map(str, ans))
 
 
@@ -1,10 +1,9 @@
 from functools import reduce
 from operator import add
 
-from aocd.models import Puzzle
+from inputs import LazyPuzzle
 
-puzzle = Puzzle(year=2018, day=12)
-raw = puzzle.input_data.split('\n')
+puzzle = LazyPuzzle(year=2018, day=12)
 
 EMPTY = '.'
 FULL = '#'
@@ -74,6 +73,7 @@ def solve():
 
     assert part_1(test_init, test_rules, 350) == part_2(test_init, test_rules, 350)
 
+    raw = puzzle.input_data.split('\n')
     initial = raw[0].replace('initial state: ', '')
 
     rules = {lhs: rhs for lhs, rhs in map(lambda row: row.split(' => '), raw[2:])}
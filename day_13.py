@@ -2,11 +2,10 @@ from collections import defaultdict
 from enum import Enum
 from typing import Dict, Optional, Tuple
 
-from aocd.models import Puzzle
+from inputs import LazyPuzzle
 
-puzzle = Puzzle(year=2018, day=13)
+puzzle = LazyPuzzle(year=2018, day=13)
 left_turn = '∖'
-raw = puzzle.input_data.replace('\\', left_turn)
 
 
 def format(*args):
@@ -297,6 +296,7 @@ def part_2(graph, carts):
 
 
 def solve():
+    raw = puzzle.input_data.replace('\\', left_turn)
     graph, carts = parse_tracks(raw)
     print_rails(carts, graph)
     ans = part_1(graph, carts)
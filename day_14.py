@@ -1,7 +1,6 @@
-from aocd.models import Puzzle
+from inputs import LazyPuzzle
 
-puzzle = Puzzle(year=2018, day=14)
-puzzle_input = puzzle.input_data
+puzzle = LazyPuzzle(year=2018, day=14)
 brackets = [('(', ')'), ('[', ']')]
 
 
@@ -64,6 +63,7 @@ def solve():
     assert part_1('18') == '9251071085'
     assert part_1('2018') == '5941429882'
 
+    puzzle_input = puzzle.input_data
     ans = part_1(puzzle_input)
     puzzle.answer_a = ans
 
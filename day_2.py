@@ -1,9 +1,11 @@
 from collections import Counter
 from typing import List
 
-from aocd.models import Puzzle
+import numpy as np
 
-puzzle = Puzzle(year=2018, day=2)
+from inputs import LazyPuzzle
+
+puzzle = LazyPuzzle(year=2018, day=2)
 
 
 def has_same_letters(number: int, box_id: str):
@@ -22,35 +24,80 @@ def choose_ids(box_ids: List[str]):
     return rv
 
 
+def id_matrix(data: bytes):
+    """Box ids of a newline separated buffer as rows of a uint8 matrix, shorter ids padded with zeros."""
+    chars = np.frombuffer(data, dtype=np.uint8)
+    breaks = np.flatnonzero(chars == ord('\n'))
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks, [len(chars)]))
+    lengths = ends - starts
+    width = int(lengths.max())
+    if (lengths[:-1] == width).all() and len(chars) == len(starts) * (width + 1) - 1:
+        # every id has the same length, the buffer only has to be reshaped
+        return np.pad(chars, (0, 1)).reshape(-1, width + 1)[:, :width]
+    matrix = np.zeros((len(starts), width), dtype=np.uint8)
+    columns = np.arange(width)
+    inside = columns < lengths[:, np.newaxis]
+    matrix[inside] = chars[(starts[:, np.newaxis] + columns)[inside]]
+    return matrix
+
+
+def letter_histograms(matrix):
+    rows = np.repeat(np.arange(matrix.shape[0]), matrix.shape[1]).reshape(matrix.shape)
+    letters = (matrix >= ord('a')) & (matrix <= ord('z'))
+    cells = rows[letters] * 26 + (matrix[letters] - ord('a'))
+    return np.bincount(cells, minlength=matrix.shape[0] * 26).reshape(-1, 26)
+
+
+def checksum(data: bytes):
+    histograms = letter_histograms(id_matrix(data.strip()))
+    twos = (histograms == 2).any(axis=1).sum()
+    threes = (histograms == 3).any(axis=1).sum()
+    return int(twos) * int(threes)
+
+
 def part1():
-    input = puzzle.input_data.split()
-    box_ids = choose_ids(input)
-    puzzle.answer_a = len(box_ids[3]) * len(box_ids[2])
-
-
-def diff_on_one_pos(a, b):
-    if len(a) != len(b):
-        return False
-    diff_count = 0
-    diff_idx = None
-    for idx, (c1, c2) in enumerate(zip(a, b)):
-        if c1 != c2:
-            if diff_count == 0:
-                diff_count += 1
-                diff_idx = idx
-            else:
-                return False, None
-    return True, diff_idx
+    puzzle.answer_a = checksum(puzzle.input_data.encode())
+
+
+def masked(box_id: str):
+    # one key per position, ids differing only there share it; the position keeps "ab" + "c" apart from "a" + "bc"
+    for pos in range(len(box_id)):
+        yield pos, box_id[:pos] + box_id[pos + 1:]
+
+
+def first_near_duplicate(box_ids: List[str]):
+    """First id differing from an earlier one in exactly one position, as (earlier id, id, position)."""
+    seen = {}
+    for id in box_ids:
+        for key in masked(id):
+            other = seen.setdefault(key, id)
+            if other != id:
+                return other, id, key[0]
+    return None
+
+
+def near_duplicates(box_ids: List[str]):
+    """All pairs of ids differing in exactly one position, as (id, later id, position)."""
+    first = {}
+    groups = {}
+    for id in dict.fromkeys(box_ids):
+        for key in masked(id):
+            other = first.setdefault(key, id)
+            if other != id:
+                # only keys shared by several ids get a list
+                groups.setdefault(key, [other]).append(id)
+    pairs = []
+    for (pos, _), ids in groups.items():
+        for idx, id1 in enumerate(ids):
+            pairs.extend((id1, id2, pos) for id2 in ids[idx + 1:])
+    return pairs
 
 
 def part2():
     box_ids = puzzle.input_data.split()
-    for idx1, id1 in enumerate(box_ids):
-        for id2 in box_ids[idx1 + 1:]:
-            diff, pos = diff_on_one_pos(id1, id2)
-            if diff:
-                puzzle.answer_b = str(id1[:pos] + id1[pos + 1:])
-                return
+    id1, _, pos = first_near_duplicate(box_ids)
+    puzzle.answer_b = id1[:pos] + id1[pos + 1:]
 
 
 if __name__ == '__main__':
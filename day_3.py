@@ -1,8 +1,13 @@
 import re
 
-from aocd.models import Puzzle
+import numpy as np
 
-puzzle = Puzzle(year=2018, day=3)
+from inputs import LazyPuzzle
+
+puzzle = LazyPuzzle(year=2018, day=3)
+
+# fabrics with more square inches than this are swept instead of rasterised
+DENSE_LIMIT = 1 << 26
 
 
 class Rect:
@@ -53,27 +58,232 @@ class Rect:
         return f'Rect#{self.id}<{self.x}, {self.y}, {self.w}, {self.y}>'
 
 
-rectangles = list(map(Rect.from_claim, puzzle.input_data.split("\n")))
+def parse(input_data):
+    return list(map(Rect.from_claim, input_data.split("\n")))
+
+
+class Coverage:
+    """Number of claims covering every square inch, built from a difference array in O(n + area)."""
+
+    def __init__(self, rectangles):
+        self.ids = np.array([r.id for r in rectangles], dtype=np.int64)
+        self.x0 = np.array([r.x for r in rectangles], dtype=np.int64)
+        self.y0 = np.array([r.y for r in rectangles], dtype=np.int64)
+        self.x1 = self.x0 + np.array([r.w for r in rectangles], dtype=np.int64)
+        self.y1 = self.y0 + np.array([r.h for r in rectangles], dtype=np.int64)
+        width = int(self.x1.max(initial=0)) + 1
+        height = int(self.y1.max(initial=0)) + 1
+        diff = np.zeros((height, width), dtype=np.int32)
+        np.add.at(diff, (self.y0, self.x0), 1)
+        np.add.at(diff, (self.y0, self.x1), -1)
+        np.add.at(diff, (self.y1, self.x0), -1)
+        np.add.at(diff, (self.y1, self.x1), 1)
+        # the sums are done in place, the one int32 buffer ends up holding the counts and then the table
+        diff.cumsum(axis=0, out=diff)
+        diff.cumsum(axis=1, out=diff)
+        overlapped = diff[:-1, :-1] >= 2
+        # summed-area table of the overlapped squares, padded with a zero row and column
+        self.overlapped = diff
+        self.overlapped[0] = 0
+        self.overlapped[:, 0] = 0
+        np.cumsum(overlapped, axis=0, dtype=np.int32, out=self.overlapped[1:, 1:])
+        self.overlapped[1:, 1:].cumsum(axis=1, out=self.overlapped[1:, 1:])
+
+    def overlap_area(self):
+        return int(self.overlapped[-1, -1])
+
+    def isolated(self):
+        t = self.overlapped
+        inside = t[self.y1, self.x1] - t[self.y0, self.x1] - t[self.y1, self.x0] + t[self.y0, self.x0]
+        return self.ids[inside == 0].tolist()
+
+
+class CoverTree:
+    """Segment tree over compressed y coordinates with the length covered by at least one and two intervals."""
+
+    def __init__(self, ys):
+        self.ys = ys
+        n = len(ys) - 1
+        self.count = [0] * (4 * n)
+        self.once = [0] * (4 * n)
+        self.twice = [0] * (4 * n)
+
+    def add(self, lo, hi, delta, node=1, left=0, right=None):
+        if right is None:
+            right = len(self.ys) - 1
+        if hi <= left or right <= lo:
+            return
+        if lo <= left and right <= hi:
+            self.count[node] += delta
+        else:
+            mid = (left + right) // 2
+            self.add(lo, hi, delta, 2 * node, left, mid)
+            self.add(lo, hi, delta, 2 * node + 1, mid, right)
+        self.update(node, left, right)
+
+    def update(self, node, left, right):
+        full = self.ys[right] - self.ys[left]
+        leaf = right - left == 1
+        once = 0 if leaf else self.once[2 * node] + self.once[2 * node + 1]
+        twice = 0 if leaf else self.twice[2 * node] + self.twice[2 * node + 1]
+        count = self.count[node]
+        self.once[node] = full if count >= 1 else once
+        self.twice[node] = full if count >= 2 else once if count == 1 else twice
+
+    def covered_twice(self):
+        return self.twice[1]
+
+
+class Fenwick:
+    def __init__(self, size):
+        self.tree = [0] * (size + 1)
+
+    def add(self, i, delta=1):
+        i += 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i):
+        """Sum of the first i positions."""
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+
+class IntervalCounter:
+    """Counts half-open intervals [start, end) over compressed coordinates that overlap a query interval."""
+
+    def __init__(self, size):
+        self.total = 0
+        self.starts = Fenwick(size)
+        self.ends = Fenwick(size)
+
+    def add(self, start, end):
+        self.total += 1
+        self.starts.add(start)
+        self.ends.add(end)
+
+    def overlapping(self, start, end):
+        ends_before = self.ends.prefix(start + 1)
+        starts_after = self.total - self.starts.prefix(end)
+        return self.total - ends_before - starts_after
+
+
+def sweep_events(rectangles):
+    # at equal x removals go first, so claims that only touch do not overlap
+    events = []
+    for i, r in enumerate(rectangles):
+        events.append((r.x, 1, i, r))
+        events.append((r.x + r.w, 0, i, r))
+    events.sort(key=lambda e: e[:3])
+    ys = sorted({y for *_, r in events for y in (r.y, r.y + r.h)})
+    return events, ys, {y: i for i, y in enumerate(ys)}
+
+
+def sweep_overlap_area(rectangles):
+    """Area covered by two or more claims in O(n log n), memory does not depend on the fabric size."""
+    events, ys, index = sweep_events(rectangles)
+    if not events:
+        return 0
+    tree = CoverTree(ys)
+    area = 0
+    last_x = events[0][0]
+    for x, inserted, _, r in events:
+        area += tree.covered_twice() * (x - last_x)
+        last_x = x
+        tree.add(index[r.y], index[r.y + r.h], 1 if inserted else -1)
+    return area
+
+
+def sweep_isolated(rectangles):
+    """Ids of claims overlapping no other claim in O(n log n)."""
+    events, ys, index = sweep_events(rectangles)
+    inserted = IntervalCounter(len(ys))
+    removed = IntervalCounter(len(ys))
+    seen_at_insert = {}
+    isolated = []
+    for _, is_insert, i, r in events:
+        lo, hi = index[r.y], index[r.y + r.h]
+        seen = inserted.overlapping(lo, hi)
+        if is_insert:
+            # active claims overlapping this one are all inserted but not yet removed
+            if seen - removed.overlapping(lo, hi) == 0:
+                seen_at_insert[i] = seen
+            inserted.add(lo, hi)
+        else:
+            # anything inserted while this claim was active is still counted by `inserted`
+            if i in seen_at_insert and seen - 1 == seen_at_insert[i]:
+                isolated.append((i, r.id))
+            removed.add(lo, hi)
+    return [id for _, id in sorted(isolated)]
+
+
+class RectIndex:
+    """Uniform grid of buckets over a live set of claims, a query only looks at the buckets it touches."""
+
+    def __init__(self, cell_size=32):
+        self.cell_size = cell_size
+        self.buckets = {}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def cells(self, rect):
+        c = self.cell_size
+        for cx in range(rect.x // c, (rect.x + max(rect.w, 1) - 1) // c + 1):
+            for cy in range(rect.y // c, (rect.y + max(rect.h, 1) - 1) // c + 1):
+                yield cx, cy
+
+    def add(self, rect):
+        for cell in self.cells(rect):
+            self.buckets.setdefault(cell, set()).add(rect)
+        self.size += 1
+
+    def remove(self, rect):
+        for cell in self.cells(rect):
+            bucket = self.buckets[cell]
+            bucket.remove(rect)
+            if not bucket:
+                del self.buckets[cell]
+        self.size -= 1
+
+    def candidates(self, rect):
+        for cell in self.cells(rect):
+            for other in self.buckets.get(cell, ()):
+                if other is not rect and other.collide(rect):
+                    yield other
+
+    def query_overlapping(self, rect):
+        return list(dict.fromkeys(self.candidates(rect)))
+
+    def any_overlap(self, rect):
+        return next(self.candidates(rect), None) is not None
+
+
+def is_sparse(rectangles):
+    width = max((r.x + r.w for r in rectangles), default=0)
+    height = max((r.y + r.h for r in rectangles), default=0)
+    return width * height > DENSE_LIMIT
 
 
 def part1():
-    pieces = set()
-    for idx, r1 in enumerate(rectangles):
-        for r2 in rectangles[idx + 1:]:
-            intersection = r1.intersection(r2)
-            if intersection is not None:
-                pieces.update(intersection.to_pieces())
-    puzzle.answer_a = len(pieces)
+    rectangles = parse(puzzle.input_data)
+    if is_sparse(rectangles):
+        puzzle.answer_a = sweep_overlap_area(rectangles)
+    else:
+        puzzle.answer_a = Coverage(rectangles).overlap_area()
 
 
 def part2():
-    for r1 in rectangles:
-        for r2 in rectangles:
-            if r1.id != r2.id and r1.collide(r2):
-                break
-        else:
-            puzzle.answer_b = r1.id
-            break
+    rectangles = parse(puzzle.input_data)
+    if is_sparse(rectangles):
+        puzzle.answer_b = sweep_isolated(rectangles)[0]
+    else:
+        puzzle.answer_b = Coverage(rectangles).isolated()[0]
 
 
 if __name__ == '__main__':
@@ -1,75 +1,150 @@
-import re
-from collections import defaultdict
-from datetime import datetime
-from enum import Enum
-
-from aocd.models import Puzzle
-
-puzzle = Puzzle(year=2018, day=4)
-
-
-class Action:
-    def __init__(self, date, action, guard_id):
-        self.guard_id = guard_id
-        self.type = {
-            'falls asleep': Type.SLEEP,
-            'wakes up': Type.WAKE_UP
-        }.get(action, Type.START)
-        self.date = date
-
-
-class Type(Enum):
-    START = 0
-    WAKE_UP = 1
-    SLEEP = 2
-
-
-def parse(line):
-    pattern = r"\[(?P<datetime>(\d{4}-\d{2}-\d{2} \d{2}:\d{2}))\] " \
-              r"(?P<action>(Guard #(?P<guard_id>\d+) begins shift|falls asleep|wakes up))"
-    match = re.match(pattern, line)
-    dt = match.group("datetime")
-    dt = datetime.strptime(dt, '%Y-%m-%d %H:%M')
-    action = match.group("action")
-    guard_id = match.group('guard_id')
-    return Action(dt, action, guard_id)
-
-
-raw_data = puzzle.input_data
-parsed_data = sorted(map(parse, raw_data.split("\n")), key=lambda a: a.date)
+import heapq
+
+import numpy as np
+
+from inputs import LazyPuzzle
+
+puzzle = LazyPuzzle(year=2018, day=4)
+
+# offsets of the digits of the fixed-width "[YYYY-MM-DD HH:MM]" prefix every line starts with
+TIMESTAMP_DIGITS = [1, 2, 3, 4, 6, 7, 9, 10, 12, 13, 15, 16]
+
+
+def read_log(data: bytes):
+    """Sorted log as arrays of minute, action ('G', 'f' or 'w') and guard id (0 unless the line starts a shift)."""
+    chars = np.frombuffer(data, dtype=np.uint8)
+    starts = np.concatenate(([0], np.flatnonzero(chars == ord('\n')) + 1))
+    starts = starts[starts + TIMESTAMP_DIGITS[-1] < len(chars)]
+    # the timestamp as the number YYYYMMDDHHMM orders the lines without parsing dates
+    timestamps = np.zeros(len(starts), dtype=np.int64)
+    for offset in TIMESTAMP_DIGITS:
+        timestamps = timestamps * 10 + (chars[starts + offset] - ord('0'))
+    order = np.argsort(timestamps, kind='stable')
+    starts = starts[order]
+    actions = chars[starts + len("[1518-11-01 00:00] ")]
+    shifts = actions == ord('G')
+    position = starts[shifts] + len("[1518-11-01 00:00] Guard #")
+    ids = np.zeros(len(position), dtype=np.int64)
+    reading = np.ones(len(position), dtype=bool)
+    while reading.any():
+        digit = chars[np.minimum(position, len(chars) - 1)].astype(np.int64) - ord('0')
+        reading &= (position < len(chars)) & (digit >= 0) & (digit <= 9)
+        ids = np.where(reading, ids * 10 + digit, ids)
+        position += 1
+    guard_ids = np.zeros(len(starts), dtype=np.int64)
+    guard_ids[shifts] = ids
+    return timestamps[order] % 100, actions, guard_ids
+
+
+def sleep_matrix(minutes, actions, guard_ids):
+    """Guard ids and a guards x 60 matrix of how often each guard was asleep in each minute."""
+    lines = np.arange(len(actions))
+    shift = np.maximum.accumulate(np.where(actions == ord('G'), lines, 0))
+    wakes = np.flatnonzero(actions == ord('w'))
+    ids, rows = np.unique(guard_ids[shift[wakes]], return_inverse=True)
+    # each nap adds one to a range of minutes, so add its ends to a difference matrix and sum along the minutes
+    diff = np.bincount(rows * 61 + minutes[wakes - 1], minlength=len(ids) * 61)
+    diff -= np.bincount(rows * 61 + minutes[wakes], minlength=len(ids) * 61)
+    return ids, diff.reshape(-1, 61).cumsum(axis=1)[:, :60]
+
+
+def strategy_1(guard_ids, matrix):
+    guard = matrix.sum(axis=1).argmax()
+    return int(guard_ids[guard]) * int(matrix[guard].argmax())
+
+
+def strategy_2(guard_ids, matrix):
+    guard, minute = divmod(int(matrix.argmax()), 60)
+    return int(guard_ids[guard]) * minute
+
+
+class SleepIndex:
+    """Guard sleep histograms updated as log lines arrive.
+
+    Lines may arrive out of order by up to `window` lines: they wait in a heap ordered by timestamp and
+    are applied once the window is full or on flush. Counts only ever grow, so the maxima are tracked as
+    they change and every query is O(1)."""
+
+    def __init__(self, window=1024):
+        self.window = window
+        self.pending = []
+        self.received = 0
+        self.applied = None
+        self.guard = None
+        self.asleep_since = None
+        self.minutes = {}
+        self.totals = {}
+        self.best_minute = {}
+        self.sleepiest = None
+        self.consistent = None
+
+    def add(self, line):
+        line = line.strip()
+        if not line:
+            return
+        if self.applied is not None and line[1:17] < self.applied:
+            raise ValueError(f"line arrived after its window was applied: {line}")
+        heapq.heappush(self.pending, (line[1:17], self.received, line))
+        self.received += 1
+        if len(self.pending) > self.window:
+            self.apply(heapq.heappop(self.pending)[2])
+
+    def extend(self, lines):
+        for line in lines:
+            self.add(line)
+
+    def flush(self):
+        while self.pending:
+            self.apply(heapq.heappop(self.pending)[2])
+
+    def apply(self, line):
+        self.applied = line[1:17]
+        minute = int(line[15:17])
+        if line[19] == 'G':
+            self.guard = int(line[26:line.index(' ', 26)])
+        elif line[19] == 'f':
+            self.asleep_since = minute
+        else:
+            self.nap(self.guard, self.asleep_since, minute)
+
+    def nap(self, guard, start, end):
+        if guard not in self.minutes:
+            self.minutes[guard] = [0] * 60
+            self.totals[guard] = 0
+            self.best_minute[guard] = start
+        minutes = self.minutes[guard]
+        # ties go to the lowest guard id and minute, the same as an argmax over the sleep matrix
+        for minute in range(start, end):
+            minutes[minute] += 1
+            best = self.best_minute[guard]
+            if (minutes[minute], -minute) > (minutes[best], -best):
+                self.best_minute[guard] = minute
+            if self.consistent is None or (minutes[minute], -guard, -minute) > self.consistency(*self.consistent):
+                self.consistent = (guard, minute)
+        self.totals[guard] += end - start
+        if self.sleepiest is None or (self.totals[guard], -guard) > (self.totals[self.sleepiest], -self.sleepiest):
+            self.sleepiest = guard
+
+    def consistency(self, guard, minute):
+        return self.minutes[guard][minute], -guard, -minute
+
+    def sleepiest_guard(self):
+        return self.sleepiest
+
+    def sleepiest_minute(self, guard=None):
+        return self.best_minute.get(self.sleepiest if guard is None else guard)
+
+    def most_consistent(self):
+        """Guard and minute with the most naps of any guard in any single minute."""
+        return self.consistent
 
 
 def part_1():
-    guard_id = None
-    time_slept = defaultdict(lambda: [0] * 60)
-    for action_id, action in enumerate(parsed_data):
-        if action.type == Type.START:
-            guard_id = action.guard_id
-        if action.type == Type.WAKE_UP:
-            for min in range(parsed_data[action_id - 1].date.minute, action.date.minute):
-                time_slept[guard_id][min] += 1
-    most_sleepy_guard_id = max(time_slept.items(), key=lambda x: sum(x[1]))[0]
-    max_minute = max(range(len(time_slept[most_sleepy_guard_id])), key=lambda x: time_slept[most_sleepy_guard_id][x])
-    puzzle.answer_a = max_minute * int(most_sleepy_guard_id)
+    puzzle.answer_a = strategy_1(*sleep_matrix(*read_log(puzzle.input_data.encode())))
 
 
 def part_2():
-    guard_id = None
-    time_slept = [defaultdict(int) for _ in range(60)]
-    most_sleepy_guard_id = None
-    max_minute = None
-    slept_over_minute_count = 0
-    for action_id, action in enumerate(parsed_data):
-        if action.type == Type.START:
-            guard_id = action.guard_id
-        if action.type == Type.WAKE_UP:
-            for minute in range(parsed_data[action_id - 1].date.minute, action.date.minute):
-                time_slept[minute][guard_id] += 1
-                if slept_over_minute_count < time_slept[minute][guard_id]:
-                    slept_over_minute_count = time_slept[minute][guard_id]
-                    most_sleepy_guard_id = guard_id
-                    max_minute = minute
-    puzzle.answer_b = max_minute * int(most_sleepy_guard_id)
+    puzzle.answer_b = strategy_2(*sleep_matrix(*read_log(puzzle.input_data.encode())))
 
 
 if __name__ == '__main__':
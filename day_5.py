@@ -1,43 +1,133 @@
-from aocd.models import Puzzle
+import argparse
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
-puzzle = Puzzle(year=2018, day=5)
+from inputs import LazyPuzzle
 
+puzzle = LazyPuzzle(year=2018, day=5)
 
-def are_different_polarity(a: str, b: str):
-    return a.isupper() != b.isupper() and a.lower() == b.lower()
+# unit which reacts with the given byte, -1 for anything that is not a letter
+REACTS_WITH = [c ^ 0x20 if chr(c).isascii() and chr(c).isalpha() else -1 for c in range(256)]
 
 
-def shorten(polymer):
-    idx = 1
-    while True:
-        if are_different_polarity(polymer[idx], polymer[idx - 1]):
-            polymer = polymer[:idx - 1] + polymer[idx + 1:]
-            idx -= 1
+def react(polymer: bytes) -> bytearray:
+    stack = bytearray()
+    for unit in polymer:
+        if stack and stack[-1] == REACTS_WITH[unit]:
+            stack.pop()
         else:
-            if idx < len(polymer) - 1:
-                idx += 1
+            stack.append(unit)
+    return stack
+
+
+def shorten(polymer):
+    return react(polymer.encode()).decode()
+
+
+def react_without(polymer: bytes, unit: int):
+    return len(react(polymer.translate(None, bytes([unit, unit ^ 0x20]))))
+
+
+def shortest_without_one_type(polymer: bytes, workers=None):
+    # removing a unit cannot undo reactions, so every variant can start from the reduced polymer
+    reduced = bytes(react(polymer))
+    unit_types = sorted(set(reduced.lower()))
+    with ProcessPoolExecutor(workers) as pool:
+        lengths = pool.map(react_without, repeat(reduced), unit_types)
+        return min(lengths, default=0)
+
+
+class UnitStack:
+    """Unreacted units of a streamed polymer. With a memory limit the bottom of the stack is moved
+    to a temporary file and read back in blocks once the units above it have reacted away."""
+
+    def __init__(self, memory_limit=None):
+        self.memory_limit = memory_limit
+        self.top = bytearray()
+        self.spilled = None
+        self.spilled_size = 0
+
+    def __len__(self):
+        return self.spilled_size + len(self.top)
+
+    def spill(self):
+        if self.memory_limit is None or len(self.top) <= self.memory_limit:
+            return
+        cut = len(self.top) - self.memory_limit // 2
+        if self.spilled is None:
+            self.spilled = tempfile.TemporaryFile()
+        self.spilled.seek(self.spilled_size)
+        self.spilled.write(self.top[:cut])
+        self.spilled_size += cut
+        del self.top[:cut]
+
+    def refill(self):
+        size = min(max(1, self.memory_limit // 2), self.spilled_size)
+        self.spilled_size -= size
+        self.spilled.seek(self.spilled_size)
+        self.top[:0] = self.spilled.read(size)
+
+    def write_to(self, out):
+        if self.spilled is not None:
+            self.spilled.seek(0)
+            left = self.spilled_size
+            while left > 0:
+                block = self.spilled.read(min(left, 1 << 20))
+                out.write(block)
+                left -= len(block)
+        out.write(self.top)
+
+    def close(self):
+        if self.spilled is not None:
+            self.spilled.close()
+
+
+def reduce_stream(stream, chunk_size=1 << 20, memory_limit=None):
+    stack = UnitStack(memory_limit)
+    top = stack.top
+    while chunk := stream.read(chunk_size):
+        for unit in chunk.translate(None, b" \t\r\n"):
+            if not top and stack.spilled_size:
+                stack.refill()
+            if top and top[-1] == REACTS_WITH[unit]:
+                top.pop()
             else:
-                break
-    return polymer
+                top.append(unit)
+        stack.spill()
+    return stack
 
 
 def part_1():
-    data = puzzle.input_data
-    polymer = shorten(data)
-    puzzle.answer_a = len(polymer)
+    data = puzzle.input_data.encode()
+    puzzle.answer_a = len(react(data))
 
 
 def part_2():
-    data = puzzle.input_data
-    polimer = shorten(data)
-    unit_types = set(polimer.lower())
-    min_len = float('inf')
-    for c in unit_types:
-        short = shorten(polimer.replace(c, '').replace(c.upper(), ''))
-        min_len = min(min_len, len(short))
-    puzzle.answer_b = min_len
+    data = puzzle.input_data.encode()
+    puzzle.answer_b = shortest_without_one_type(data)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stream", help="reduce the polymer read from this file ('-' for stdin) in chunks")
+    parser.add_argument("--remaining", help="file for the polymer left after the reduction")
+    parser.add_argument("--memory-limit", type=int, help="bytes of unreacted units kept in memory")
+    args = parser.parse_args()
+    if args.stream is None:
+        part_1()
+        part_2()
+        return
+    stream = sys.stdin.buffer if args.stream == '-' else open(args.stream, "rb")
+    with stream:
+        stack = reduce_stream(stream, memory_limit=args.memory_limit)
+    print(f"Reduced length: {len(stack)}")
+    if args.remaining:
+        with open(args.remaining, "wb") as out:
+            stack.write_to(out)
+    stack.close()
 
 
 if __name__ == '__main__':
-    part_1()
-    part_2()
+    main()
@@ -1,14 +1,12 @@
 import itertools
 import string
-from collections import deque, defaultdict
-from functools import cmp_to_key
 from math import ceil, log
 
-from aocd.models import Puzzle
+import numpy as np
 
-puzzle = Puzzle(year=2018, day=6)
+from inputs import LazyPuzzle
 
-raw = puzzle.input_data
+puzzle = LazyPuzzle(year=2018, day=6)
 
 
 class Point:
@@ -65,90 +63,91 @@ def parse_data(data):
     return points
 
 
-data = parse_data(raw)
-
-
-def turn(p1: Point, p2: Point, p3: Point):
-    return (p2.x - p1.x) * (p3.y - p1.y) - (p2.y - p1.y) * (p3.x - p1.x)
+TIE = -1
+UNSEEN = -2
+
+
+def voronoi(points):
+    """Index of the nearest point for every cell of the bounding box, TIE where several are nearest.
+
+    A breadth-first search from all points at once: a cell reached in the same step from different
+    labels, or from a tie, is a tie itself. The grid is indexed [y - min_y, x - min_x]."""
+    min_x = min(p.x for p in points)
+    min_y = min(p.y for p in points)
+    width = max(p.x for p in points) - min_x + 1
+    height = max(p.y for p in points) - min_y + 1
+    labels = np.full(width * height, UNSEEN, dtype=np.int64)
+    cells = np.array([(p.y - min_y) * width + p.x - min_x for p in points], dtype=np.int64)
+    frontier, frontier_labels = merge_reached(cells, np.arange(len(points)))
+    labels[frontier] = frontier_labels
+    while len(frontier):
+        x = frontier % width
+        neighbours = np.concatenate((frontier + width, frontier - width,
+                                     np.where(x + 1 < width, frontier + 1, -1),
+                                     np.where(x > 0, frontier - 1, -1)))
+        neighbour_labels = np.tile(frontier_labels, 4)
+        valid = (neighbours >= 0) & (neighbours < len(labels))
+        neighbours, neighbour_labels = neighbours[valid], neighbour_labels[valid]
+        unseen = labels[neighbours] == UNSEEN
+        frontier, frontier_labels = merge_reached(neighbours[unseen], neighbour_labels[unseen])
+        labels[frontier] = frontier_labels
+    return labels.reshape(height, width)
+
+
+def merge_reached(cells, labels):
+    # a cell reached with more than one label in the same step is a tie
+    if not len(cells):
+        return cells, labels
+    order = np.lexsort((labels, cells))
+    cells, labels = cells[order], labels[order]
+    first = np.flatnonzero(np.concatenate(([True], cells[1:] != cells[:-1])))
+    lowest = np.minimum.reduceat(labels, first)
+    highest = np.maximum.reduceat(labels, first)
+    return cells[first], np.where(lowest == highest, lowest, TIE)
+
+
+def largest_finite_area(points):
+    labels = voronoi(points)
+    # areas touching the bounding box go on forever
+    border = np.concatenate((labels[0], labels[-1], labels[:, 0], labels[:, -1]))
+    areas = np.bincount(labels[labels != TIE], minlength=len(points))
+    areas[border[border != TIE]] = 0
+    return int(areas.max())
+
+
+def distance_sums(coordinates, values):
+    """Sum of |v - c| over all coordinates c for every value v, from prefix sums of the sorted coordinates."""
+    coordinates = np.sort(np.asarray(coordinates, dtype=np.int64))
+    prefix = np.concatenate(([0], np.cumsum(coordinates)))
+    below = np.searchsorted(coordinates, values, side='right')
+    above = len(coordinates) - below
+    return values * below - prefix[below] + (prefix[-1] - prefix[below]) - values * above
+
+
+def axis_range(coordinates, limit):
+    # outside the points every step away adds len(coordinates) to the sum, so the region ends within limit // n
+    reach = max(limit, 0) // len(coordinates) + 1
+    return np.arange(min(coordinates) - reach, max(coordinates) + reach + 1, dtype=np.int64)
+
+
+def safe_region_size(points, threshold=10000):
+    """Cells with a total distance to all points below threshold, also outside of the bounding box.
+
+    The Manhattan sum splits into a sum over x and one over y, so it is enough to know both per column
+    and per row and count the pairs whose total stays below the threshold."""
+    xs = [p.x for p in points]
+    ys = [p.y for p in points]
+    closest_x = int(distance_sums(xs, np.array([sorted(xs)[len(xs) // 2]]))[0])
+    closest_y = int(distance_sums(ys, np.array([sorted(ys)[len(ys) // 2]]))[0])
+    x_sums = distance_sums(xs, axis_range(xs, threshold - closest_y))
+    y_sums = np.sort(distance_sums(ys, axis_range(ys, threshold - closest_x)))
+    return int(np.searchsorted(y_sums, threshold - x_sums, side='left').sum())
 
 
 def solve():
-    # Graham scan is probably not needed
-    points = sorted(data, key=lambda p: (p.y, p.x))
-    first = points[0]
-    points = list(map(lambda p: (p - first).rename(p.name), points))
-    first = points[0]
-    points = sorted(points, key=cmp_to_key(lambda a, b: a.cross(b)))
-    stack = deque()
-    for point in points:
-        while len(stack) > 1 and turn(stack[-2], stack[-1], point) > 0:
-            stack.pop()
-        stack.append(point)
-    inside = list(filter(lambda p: p not in stack, points))
-
-    def closest_to(cell: Point):
-        distances = defaultdict(list)
-        for point in points:
-            dist = cell.manth_dist(point)
-            distances[dist].append(point)
-        return distances
-
-    min_x = min(map(lambda p: p.x, points))
-    max_x = max(map(lambda p: p.x, points))
-    min_y = min(map(lambda p: p.y, points))
-    max_y = max(map(lambda p: p.y, points))
-
-    def get_min_key(dictionary):
-        min_key = min(dictionary.keys())
-        if len(dictionary[min_key]) == 1:
-            min_val = dictionary[min_key][0]
-        else:
-            min_val = None
-        return min_val
-
-    def flood_fill(beginning: Point):
-        visited = set()
-        q = deque()
-        q.append(beginning)
-        while len(q) != 0:
-            point = q.pop()
-            closest = closest_to(point)
-            closest = get_min_key(closest)
-            if point in visited or closest != beginning:
-                continue
-            visited.add(point)
-            directions = [(1, 0), (0, 1), (-1, 0), (0, -1)]
-            for y, x in directions:
-                new_point = point + Point(y, x)
-                if new_point.x < min_x or new_point.x > max_x:
-                    continue
-                if new_point.y < min_y or new_point.y > max_y:
-                    continue
-                if new_point not in visited:
-                    q.append(new_point)
-        return len(visited)
-
-    ans = 0
-    for point in inside:
-        area = flood_fill(point)
-        if area > ans:
-            ans = area
-    puzzle.answer_a = ans
-
-    region_size = 0
-    for y in range(min_y, max_y + 1):
-        found_row = False
-        for x in range(min_x, max_x + 1):
-            closest = closest_to(Point(y, x))
-            sum_dist = 0
-            for dist, distance_points in closest.items():
-                sum_dist += dist * len(distance_points)
-            if sum_dist < 10000:
-                region_size += 1
-                found_row = True
-            elif found_row:
-                break
-    puzzle.answer_b = region_size
+    points = parse_data(puzzle.input_data)
+    puzzle.answer_a = largest_finite_area(points)
+    puzzle.answer_b = safe_region_size(points)
 
 
 if __name__ == '__main__':
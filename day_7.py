@@ -1,11 +1,12 @@
 import re
 from collections import defaultdict, deque
-from heapq import heappush, heappop, nsmallest
-from typing import List, Dict, Optional
-from aocd.models import Puzzle
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heapify, heappush, heappop
+from itertools import product, repeat
+from typing import Callable, List, Dict, Optional
+from inputs import LazyPuzzle
 
-puzzle = Puzzle(year=2018, day=7)
-raw = puzzle.input_data
+puzzle = LazyPuzzle(year=2018, day=7)
 
 # raw = """Step C must be finished before step A can begin.
 # Step C must be finished before step F can begin.
@@ -15,7 +16,7 @@ raw = puzzle.input_data
 # Step D must be finished before step E can begin.
 # Step F must be finished before step E can begin."""
 
-pattern = r"Step (?P<before>[A-Z]) must be finished before step (?P<after>[A-Z]) can begin\."
+pattern = r"Step (?P<before>\w+) must be finished before step (?P<after>\w+) can begin\."
 
 
 def calc_id_degree(graph):
@@ -47,7 +48,156 @@ def topological_sort(graph: Dict[str, List[str]]):
     return order
 
 
-def solve():
+class TopologicalOrder:
+    """Alphabetically first topological order kept up to date as steps and edges come and go.
+
+    Kahn's algorithm with a heap picks the smallest available step at every position, so a change only
+    affects the order from the first position where the set of available steps differs. From there the
+    order is sorted again until the steps placed are the same set as before, after which it is unchanged."""
+
+    def __init__(self, graph: Optional[Dict[str, List[str]]] = None):
+        graph = graph or {}
+        self.successors = {task: set(next_tasks) for task, next_tasks in graph.items()}
+        self.predecessors = {task: set() for task in graph}
+        for task, next_tasks in graph.items():
+            for next_task in next_tasks:
+                self.successors.setdefault(next_task, set())
+                self.predecessors.setdefault(next_task, set()).add(task)
+        in_degree = {task: len(prev_tasks) for task, prev_tasks in self.predecessors.items()}
+        queue = [task for task, count in in_degree.items() if count == 0]
+        heapify(queue)
+        self.order = []
+        while queue:
+            current = heappop(queue)
+            self.order.append(current)
+            for neighbour in self.successors[current]:
+                in_degree[neighbour] -= 1
+                if in_degree[neighbour] == 0:
+                    heappush(queue, neighbour)
+        if len(self.order) != len(self.successors):
+            raise ValueError("dependency graph has a cycle")
+        self.position = {task: i for i, task in enumerate(self.order)}
+        # first position at which a step could be placed, one past its last predecessor
+        self.available = {task: self.available_from(task) for task in self.order}
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def __len__(self):
+        return len(self.order)
+
+    def add_step(self, task):
+        if task in self.position:
+            return
+        self.successors[task] = set()
+        self.predecessors[task] = set()
+        self.available[task] = 0
+        # a step without dependencies is taken at the first position holding a larger name
+        start = next((i for i, other in enumerate(self.order) if other > task), len(self.order))
+        self.position[task] = len(self.order)
+        self.order.append(task)
+        self.rebuild(start, (task,))
+
+    def remove_step(self, task):
+        for prev_task in self.predecessors.pop(task):
+            self.successors[prev_task].discard(task)
+        next_tasks = self.successors.pop(task)
+        for next_task in next_tasks:
+            self.predecessors[next_task].discard(task)
+        removed = self.position.pop(task)
+        del self.available[task]
+        self.order.pop(removed)
+        for i in range(removed, len(self.order)):
+            other = self.order[i]
+            self.position[other] = i
+            if self.available[other] > removed + 1:
+                self.available[other] -= 1
+        start = removed
+        for next_task in next_tasks:
+            self.available[next_task] = self.available_from(next_task)
+            start = min(start, self.available[next_task])
+        self.rebuild(start, next_tasks)
+
+    def add_edge(self, before, after):
+        if before == after:
+            raise ValueError(f"step {before} cannot come before itself")
+        self.add_step(before)
+        self.add_step(after)
+        if after in self.successors[before]:
+            return
+        if self.position[before] > self.position[after] and self.reaches(after, before):
+            raise ValueError(f"step {before} before {after} would close a cycle")
+        self.successors[before].add(after)
+        self.predecessors[after].add(before)
+        self.available[after] = max(self.available[after], self.position[before] + 1)
+        # already in order, the new edge only removes `after` from positions where it was not the smallest
+        if self.position[before] > self.position[after]:
+            self.rebuild(self.position[after], (after,))
+
+    def remove_edge(self, before, after):
+        self.successors[before].remove(after)
+        self.predecessors[after].remove(before)
+        self.available[after] = self.available_from(after)
+        self.rebuild(min(self.available[after], self.position[after]), (after,))
+
+    def available_from(self, task):
+        return max((self.position[prev_task] + 1 for prev_task in self.predecessors[task]), default=0)
+
+    def reaches(self, source, target):
+        # only steps placed between the two can lie on a path from source to target
+        limit = self.position[target]
+        stack = [source]
+        seen = {source}
+        while stack:
+            task = stack.pop()
+            if task == target:
+                return True
+            for next_task in self.successors[task]:
+                if next_task not in seen and self.position[next_task] <= limit:
+                    seen.add(next_task)
+                    stack.append(next_task)
+        return False
+
+    def rebuild(self, start, changed=()):
+        """Sort the order again from start, changed are the steps whose predecessors were changed."""
+        old = self.order[start:]
+        position = self.position
+        queue = [task for task in old if self.available[task] <= start]
+        heapify(queue)
+        # predecessors left to place, counted when a step is first reached from a placed one
+        in_degree = {}
+        placed = set()
+        region = []
+        # steps in exactly one of the new and the old prefix of the same length, once there are none and
+        # the changed steps are placed the rest of the old order is still the right one
+        difference = 0
+        unplaced = len(set(changed) & set(old))
+        while queue:
+            current = heappop(queue)
+            difference += -1 if old[len(region)] in placed else 1
+            placed.add(current)
+            region.append(current)
+            difference += -1 if position[current] - start < len(region) else 1
+            unplaced -= current in changed
+            if difference == 0 and unplaced == 0:
+                break
+            for neighbour in self.successors[current]:
+                if neighbour not in in_degree:
+                    in_degree[neighbour] = sum(position[prev_task] >= start and prev_task not in placed
+                                               for prev_task in self.predecessors[neighbour])
+                else:
+                    in_degree[neighbour] -= 1
+                if in_degree[neighbour] == 0:
+                    heappush(queue, neighbour)
+        self.order[start:start + len(region)] = region
+        for i, task in enumerate(region, start):
+            position[task] = i
+        for task in region:
+            for neighbour in self.successors[task]:
+                self.available[neighbour] = self.available_from(neighbour)
+
+
+def parse_graph(raw):
     graph = defaultdict(list)
     for line in raw.split("\n"):
         match = re.match(pattern, line)
@@ -56,6 +206,103 @@ def solve():
         graph[before].append(after)
         if after not in graph:
             graph[after] = []
+    return graph
+
+
+def letter_duration(task_additional_time=60):
+    def task_duration(task_name: str):
+        return ord(task_name[0]) - ord('A') + task_additional_time + 1
+    return task_duration
+
+
+class Schedule:
+    def __init__(self, makespan, busy, start_times):
+        self.makespan = makespan
+        self.busy = busy
+        self.start_times = start_times
+
+    def utilisation(self):
+        return [b / self.makespan if self.makespan else 0 for b in self.busy]
+
+
+class TaskGraph:
+    """Dependency graph with steps numbered in name order, built once and shared by many schedules."""
+
+    def __init__(self, graph: Dict[str, List[str]]):
+        self.names = sorted(graph)
+        index = {name: i for i, name in enumerate(self.names)}
+        self.successors = [[index[next_task] for next_task in graph[name]] for name in self.names]
+        self.in_degree = [0] * len(self.names)
+        for next_tasks in self.successors:
+            for next_task in next_tasks:
+                self.in_degree[next_task] += 1
+
+    def schedule(self, workers_number: int, duration: Callable[[str], int]):
+        """Simulate workers taking the alphabetically first ready step whenever they are idle.
+
+        Ready steps wait in a heap by number, which is name order, and running steps in a heap by
+        finish time, so every step is pushed and popped once."""
+        durations = [duration(name) for name in self.names]
+        in_degree = list(self.in_degree)
+        ready = [task for task, count in enumerate(in_degree) if count == 0]
+        heapify(ready)
+        idle = list(range(workers_number))
+        running = []
+        busy = [0] * workers_number
+        start_times = {}
+        current_time = 0
+        while True:
+            while ready and idle:
+                task = heappop(ready)
+                worker = heappop(idle)
+                start_times[self.names[task]] = current_time
+                busy[worker] += durations[task]
+                heappush(running, (current_time + durations[task], task, worker))
+            if not running:
+                break
+            current_time = running[0][0]
+            while running and running[0][0] == current_time:
+                _, task, worker = heappop(running)
+                heappush(idle, worker)
+                for successor in self.successors[task]:
+                    in_degree[successor] -= 1
+                    if in_degree[successor] == 0:
+                        heappush(ready, successor)
+        if len(start_times) != len(self.names):
+            raise ValueError("dependency graph has a cycle")
+        return Schedule(current_time, busy, start_times)
+
+
+def schedule(graph: Dict[str, List[str]], workers_number: int, duration: Callable[[str], int]):
+    return TaskGraph(graph).schedule(workers_number, duration)
+
+
+scenario_graph = None
+
+
+def set_scenario_graph(task_graph):
+    global scenario_graph
+    scenario_graph = task_graph
+
+
+def run_scenario(workers_number, task_additional_time, duration_for):
+    return scenario_graph.schedule(workers_number, duration_for(task_additional_time))
+
+
+def what_if(graph: Dict[str, List[str]], workers_numbers, additional_times, duration_for=letter_duration, jobs=None):
+    """Schedules for every (workers, additional time) pair, keyed by that pair.
+
+    The graph is numbered once and handed to each worker process when it starts, scenarios only
+    send their two parameters."""
+    task_graph = TaskGraph(graph)
+    scenarios = list(product(workers_numbers, additional_times))
+    with ProcessPoolExecutor(jobs, initializer=set_scenario_graph, initargs=(task_graph,)) as pool:
+        schedules = pool.map(run_scenario, [w for w, _ in scenarios], [t for _, t in scenarios], repeat(duration_for))
+        return dict(zip(scenarios, schedules))
+
+
+def solve():
+    graph = parse_graph(puzzle.input_data)
 
     # Part 1
 
@@ -64,51 +311,8 @@ def solve():
 
     # Part 2
 
-    workers_number = 5
-    task_additional_time = 60
-    inv_graph = defaultdict(list)
-    for task_id, next_tasks in graph.items():
-        for next_task in next_tasks:
-            inv_graph[next_task].append(task_id)
+    puzzle.answer_b = schedule(graph, 5, letter_duration(60)).makespan
 
-    def task_duration(task_name: str):
-        return ord(task_name[0]) - ord('A') + task_additional_time + 1
-
-    in_degree = calc_id_degree(graph)
-    tasks_available_time = {key: None for key in graph.keys()}
-    tasks_finish_time = {key: None for key in graph.keys()}
-    for task_id, task_in_degree in in_degree.items():
-        if task_in_degree == 0:
-            tasks_available_time[task_id] = 0
-    duration = {task: task_duration(task) for task in graph.keys()}
-    workers = [0 for _ in range(workers_number)]
-
-    def get_next_task():
-        all_tasks = graph.keys()
-        available_tasks = list(filter(lambda i: tasks_available_time[i] is not None, all_tasks))
-        not_finished_tasks = list(filter(lambda i: tasks_finish_time[i] is None, available_tasks))
-        min_available_time = min([tasks_available_time[i] for i in not_finished_tasks])
-        earliest_tasks = list(filter(lambda i: tasks_available_time[i] == min_available_time, not_finished_tasks))
-        lexicographical_tasks = sorted(earliest_tasks)
-        return lexicographical_tasks[0]
-
-    def is_available(task_id):
-        return all([tasks_finish_time[prev_task] is not None for prev_task in inv_graph[task_id]])
-
-    while None in tasks_finish_time.values():
-        next_task = get_next_task()
-        current_time = tasks_available_time[next_task]
-        next_worker_id = min(range(workers_number), key=lambda x: workers[x])
-        current_time = max(workers[next_worker_id], current_time)
-        task_finish_time = current_time + duration[next_task]
-        tasks_finish_time[next_task] = task_finish_time
-        workers[next_worker_id] = tasks_finish_time[next_task]
-        for successor in graph[next_task]:
-            if is_available(successor):
-                tasks_available_time[successor] = task_finish_time
-
-    ans = max(tasks_finish_time.values())
-    puzzle.answer_b = ans
 
 if __name__ == '__main__':
     solve()
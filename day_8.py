@@ -1,51 +1,146 @@
-from aocd.models import Puzzle
+import mmap
+import re
 
-puzzle = Puzzle(year=2018, day=8)
-raw = puzzle.input_data
+import numpy as np
 
+from inputs import LazyPuzzle
 
-# raw = """2 3 0 3 10 11 12 1 1 0 1 99 2 1 1 2"""
+puzzle = LazyPuzzle(year=2018, day=8)
 
-def solve():
-    data = list(map(int, raw.split(" ")))
 
-    # Part 1
-    tree = iter(data)
+# raw = """2 3 0 3 10 11 12 1 1 0 1 99 2 1 1 2"""
+
+def tokens(buffer):
+    return (int(match.group()) for match in re.finditer(rb"\d+", buffer))
 
-    def parse_node(iterator):
-        metadata_sum = 0
-        nodes_count = next(iterator)
-        metadata_count = next(iterator)
-        for i in range(nodes_count):
-            metadata_sum += parse_node(iterator)
-        for i in range(metadata_count):
-            metadata_sum += next(iterator)
-        return metadata_sum
 
-    ans = parse_node(tree)
-    puzzle.answer_a = ans
+def read_tokens(path):
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        yield from tokens(buffer)
 
-    # Part 2
-    tree = iter(data)
 
-    def parse_node(iterator):
-        metadata_sum = 0
-        nodes_count = next(iterator)
-        metadata_count = next(iterator)
+def decode(data):
+    """Metadata sum and root value of the license tree in one pass, with an explicit stack instead of recursion.
 
-        child_nodes = []
-        for i in range(nodes_count):
-            child_nodes.append(parse_node(iterator))
+    Each stack entry is an open node: children still to read, its metadata count and its children's values."""
+    iterator = iter(data)
+    metadata_sum = 0
+    stack = [[next(iterator), next(iterator), []]]
+    while True:
+        node = stack[-1]
+        if node[0] > 0:
+            node[0] -= 1
+            stack.append([next(iterator), next(iterator), []])
+            continue
+        stack.pop()
+        _, metadata_count, child_nodes = node
+        value = 0
         for i in range(metadata_count):
             entry = next(iterator)
-            if nodes_count == 0:
-                metadata_sum += entry
-            elif 0 < entry <= nodes_count:
-                metadata_sum += child_nodes[entry - 1]
-        return metadata_sum
-
-    ans = parse_node(tree)
-    puzzle.answer_b = ans
+            metadata_sum += entry
+            if not child_nodes:
+                value += entry
+            elif 0 < entry <= len(child_nodes):
+                value += child_nodes[entry - 1]
+        if not stack:
+            return metadata_sum, value
+        stack[-1][2].append(value)
+
+
+class TreeIndex:
+    """Columns over the nodes of a license tree in preorder, node 0 is the root.
+
+    A node's header starts at token offset and its subtree ends before token subtree_end, so its metadata
+    are the last meta_count tokens before that. Children of a node are child_nodes[child_start:child_start
+    + child_count]."""
+
+    COLUMNS = ("tokens", "offset", "child_count", "meta_count", "subtree_end", "subtree_size",
+               "metadata_total", "value", "parent", "child_start", "child_nodes")
+
+    def __init__(self, **columns):
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+
+    @staticmethod
+    def build(data):
+        data = np.fromiter(data, dtype=np.int64)
+        tokens = data.tolist()
+        offset, child_count, meta_count, parent = [], [], [], []
+        size = len(tokens) // 2 + 1
+        subtree_end = [0] * size
+        subtree_size = [0] * size
+        metadata_total = [0] * size
+        value = [0] * size
+        position = 0
+        stack = []
+        while True:
+            if not stack or stack[-1][1] > 0:
+                if stack:
+                    stack[-1][1] -= 1
+                node = len(offset)
+                offset.append(position)
+                child_count.append(tokens[position])
+                meta_count.append(tokens[position + 1])
+                parent.append(stack[-1][0] if stack else -1)
+                stack.append([node, tokens[position], []])
+                position += 2
+                continue
+            node, _, child_values = stack.pop()
+            metadata = tokens[position:position + meta_count[node]]
+            position += meta_count[node]
+            subtree_end[node] = position
+            subtree_size[node] = len(offset) - node
+            metadata_total[node] += sum(metadata)
+            if not child_values:
+                value[node] = sum(metadata)
+            else:
+                value[node] = sum(child_values[entry - 1] for entry in metadata if 0 < entry <= len(child_values))
+            if not stack:
+                break
+            metadata_total[stack[-1][0]] += metadata_total[node]
+            stack[-1][2].append(value[node])
+        nodes = len(offset)
+        child_count = np.array(child_count, dtype=np.int64)
+        parent = np.array(parent, dtype=np.int64)
+        return TreeIndex(
+            tokens=data[:position],
+            offset=np.array(offset, dtype=np.int64),
+            child_count=child_count,
+            meta_count=np.array(meta_count, dtype=np.int64),
+            subtree_end=np.array(subtree_end[:nodes], dtype=np.int64),
+            subtree_size=np.array(subtree_size[:nodes], dtype=np.int64),
+            metadata_total=np.array(metadata_total[:nodes], dtype=np.int64),
+            value=np.array(value[:nodes], dtype=np.int64),
+            parent=parent,
+            # nodes are numbered in preorder, so a stable sort by parent lists every node's children in order
+            child_start=np.concatenate(([0], np.cumsum(child_count)[:-1])),
+            child_nodes=np.argsort(parent[1:], kind="stable") + 1,
+        )
+
+    def __len__(self):
+        return len(self.offset)
+
+    def children(self, node):
+        start = self.child_start[node]
+        return self.child_nodes[start:start + self.child_count[node]]
+
+    def metadata(self, node):
+        end = self.subtree_end[node]
+        return self.tokens[end - self.meta_count[node]:end]
+
+    def save(self, path):
+        np.savez(path, **{name: getattr(self, name) for name in self.COLUMNS})
+
+    @staticmethod
+    def load(path):
+        with np.load(path) as columns:
+            return TreeIndex(**{name: columns[name] for name in TreeIndex.COLUMNS})
+
+
+def solve():
+    metadata_sum, root_value = decode(tokens(puzzle.input_data.encode()))
+    puzzle.answer_a = metadata_sum
+    puzzle.answer_b = root_value
 
 
 if __name__ == '__main__':
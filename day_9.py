@@ -1,10 +1,9 @@
 import re
 from typing import Optional, Dict
 
-from aocd.models import Puzzle
+from inputs import LazyPuzzle
 
-puzzle = Puzzle(year=2018, day=9)
-raw = puzzle.input_data
+puzzle = LazyPuzzle(year=2018, day=9)
 
 
 # raw = '17 players; last marble is worth 1104 points'
@@ -89,6 +88,7 @@ def play_faster(players, last_marble, logging=False):
 
 
 def solve():
+    raw = puzzle.input_data
     pattern = r'(?P<players>\d+) players; last marble is worth (?P<last_marble>\d+) points'
     m = re.match(pattern, raw)
     players = int(m.group('players'))
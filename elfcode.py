@@ -0,0 +1,476 @@
+import abc
+import enum
+from typing import Callable
+
+
+def addr(reg, a, b, c):
+    reg[c] = reg[a] + reg[b]
+
+
+def addi(reg, a, b, c):
+    reg[c] = reg[a] + b
+
+
+def mulr(reg, a, b, c):
+    reg[c] = reg[a] * reg[b]
+
+
+def muli(reg, a, b, c):
+    reg[c] = reg[a] * b
+
+
+def banr(reg, a, b, c):
+    reg[c] = reg[a] & reg[b]
+
+
+def bani(reg, a, b, c):
+    reg[c] = reg[a] & b
+
+
+def borr(reg, a, b, c):
+    reg[c] = reg[a] | reg[b]
+
+
+def bori(reg, a, b, c):
+    reg[c] = reg[a] | b
+
+
+def setr(reg, a, b, c):
+    reg[c] = reg[a]
+
+
+def seti(reg, a, b, c):
+    reg[c] = a
+
+
+def gtir(reg, a, b, c):
+    reg[c] = 1 if a > reg[b] else 0
+
+
+def gtri(reg, a, b, c):
+    reg[c] = 1 if reg[a] > b else 0
+
+
+def gtrr(reg, a, b, c):
+    reg[c] = 1 if reg[a] > reg[b] else 0
+
+
+def eqir(reg, a, b, c):
+    reg[c] = 1 if a == reg[b] else 0
+
+
+def eqri(reg, a, b, c):
+    reg[c] = 1 if reg[a] == b else 0
+
+
+def eqrr(reg, a, b, c):
+    reg[c] = 1 if reg[a] == reg[b] else 0
+
+
+OPERATIONS = [
+    addr, addi,
+    mulr, muli,
+    banr, bani,
+    borr, bori,
+    setr, seti,
+    gtir, gtri, gtrr,
+    eqir, eqri, eqrr
+]
+
+
+class Opcode(enum.StrEnum):
+    IP = "#ip"
+    ADDR = "addr"
+    ADDI = "addi"
+    MULR = "mulr"
+    MULI = "muli"
+    BANR = "banr"
+    BANI = "bani"
+    BORR = "borr"
+    BORI = "bori"
+    SETR = "setr"
+    SETI = "seti"
+    GTIR = "gtir"
+    GTRI = "gtri"
+    GTRR = "gtrr"
+    EQIR = "eqir"
+    EQRI = "eqri"
+    EQRR = "eqrr"
+
+    def get_operator(self) -> Callable[[[int], int, int, int], int]:
+        if self == Opcode.IP:
+            raise RuntimeError("No operator for #ip")
+        return OPERATORS[self]
+
+
+OPERATORS = {Opcode(operation.__name__): operation for operation in OPERATIONS}
+
+# python expression and operand kinds (register, immediate or unused) of every opcode
+SOURCES = {
+    Opcode.ADDR: ("{a} + {b}", "rr"),
+    Opcode.ADDI: ("{a} + {b}", "ri"),
+    Opcode.MULR: ("{a} * {b}", "rr"),
+    Opcode.MULI: ("{a} * {b}", "ri"),
+    Opcode.BANR: ("{a} & {b}", "rr"),
+    Opcode.BANI: ("{a} & {b}", "ri"),
+    Opcode.BORR: ("{a} | {b}", "rr"),
+    Opcode.BORI: ("{a} | {b}", "ri"),
+    Opcode.SETR: ("{a}", "r-"),
+    Opcode.SETI: ("{a}", "i-"),
+    Opcode.GTIR: ("1 if {a} > {b} else 0", "ir"),
+    Opcode.GTRI: ("1 if {a} > {b} else 0", "ri"),
+    Opcode.GTRR: ("1 if {a} > {b} else 0", "rr"),
+    Opcode.EQIR: ("1 if {a} == {b} else 0", "ir"),
+    Opcode.EQRI: ("1 if {a} == {b} else 0", "ri"),
+    Opcode.EQRR: ("1 if {a} == {b} else 0", "rr"),
+}
+
+
+def parse(input_data):
+    program = []
+    ip_register = None
+    for line in input_data.split("\n"):
+        opcode = line.split(" ")[0]
+        opcode = Opcode(opcode)
+        if opcode is Opcode.IP:
+            _, reg = line.split(" ")
+            ip_register = int(reg)
+        else:
+            _, a, b, c = line.split(" ")
+            program.append((opcode, int(a), int(b), int(c)))
+    return program, ip_register
+
+
+COMMUTATIVE = {Opcode.ADDR, Opcode.MULR, Opcode.BANR, Opcode.BORR, Opcode.EQRR}
+
+
+def match_operand(pattern, value, start, ip_register, bindings):
+    # pattern is '_' (anything), an int (that immediate), 'ip' (the ip register), '>k' (jump to start + k),
+    # '#name' (any immediate) or a name bound to a register other than ip and the other names
+    if pattern == '_':
+        return bindings
+    if isinstance(pattern, int):
+        return bindings if value == pattern else None
+    if pattern == 'ip':
+        return bindings if value == ip_register else None
+    if pattern[0] == '>':
+        return bindings if value + 1 == start + int(pattern[1:]) else None
+    if pattern in bindings:
+        return bindings if bindings[pattern] == value else None
+    if pattern[0] != '#':
+        taken = {v for k, v in bindings.items() if k[0] != '#'}
+        if value == ip_register or value in taken:
+            return None
+    return {**bindings, pattern: value}
+
+
+def match_template(template, program, start, ip_register, bindings, offset=0):
+    if offset == len(template):
+        return bindings
+    name, pattern_a, pattern_b, pattern_c = template[offset]
+    opcode, a, b, c = program[start + offset]
+    if opcode != name:
+        return None
+    orders = [(pattern_a, pattern_b)]
+    if opcode in COMMUTATIVE:
+        orders.append((pattern_b, pattern_a))
+    for order_a, order_b in orders:
+        result = bindings
+        for pattern, value in ((order_a, a), (order_b, b), (pattern_c, c)):
+            result = match_operand(pattern, value, start, ip_register, result)
+            if result is None:
+                break
+        else:
+            result = match_template(template, program, start, ip_register, result, offset + 1)
+            if result is not None:
+                return result
+    return None
+
+
+def divisor_sum(number):
+    total = 0
+    i = 1
+    while i * i <= number:
+        if number % i == 0:
+            total += i
+            if i * i != number:
+                total += number // i
+        i += 1
+    return total
+
+
+class Idiom(abc.ABC):
+    """Loop recognised in a program and replaced by native code. TEMPLATE is matched against the
+    program, the loop is left with ip register equal to start + IP_VALUE."""
+
+    TEMPLATE = []
+    IP_VALUE = 0
+
+    @classmethod
+    def find(cls, program, ip_register):
+        found = {}
+        for start in range(len(program) - len(cls.TEMPLATE) + 1):
+            bindings = match_template(cls.TEMPLATE, program, start, ip_register, {})
+            if bindings is not None and cls.applies(bindings):
+                found[start] = cls(start, bindings)
+        return found
+
+    @classmethod
+    def applies(cls, bindings):
+        return True
+
+    def __init__(self, start, bindings):
+        self.start = start
+        self.bindings = bindings
+
+    def __len__(self):
+        return len(self.TEMPLATE)
+
+    def registers(self):
+        return [v for k, v in self.bindings.items() if k[0] != '#']
+
+    @abc.abstractmethod
+    def source(self, reg):
+        pass
+
+
+class DivisorSum(Idiom):
+    """for i in 1..n: for j in 1..n: if i * j == n: s += i"""
+
+    TEMPLATE = [
+        (Opcode.SETI, 1, '_', 'i'),
+        (Opcode.SETI, 1, '_', 'j'),
+        (Opcode.MULR, 'i', 'j', 't'),
+        (Opcode.EQRR, 't', 'n', 't'),
+        (Opcode.ADDR, 't', 'ip', 'ip'),
+        (Opcode.ADDI, 'ip', 1, 'ip'),
+        (Opcode.ADDR, 'i', 's', 's'),
+        (Opcode.ADDI, 'j', 1, 'j'),
+        (Opcode.GTRR, 'j', 'n', 't'),
+        (Opcode.ADDR, 'ip', 't', 'ip'),
+        (Opcode.SETI, '>2', '_', 'ip'),
+        (Opcode.ADDI, 'i', 1, 'i'),
+        (Opcode.GTRR, 'i', 'n', 't'),
+        (Opcode.ADDR, 't', 'ip', 'ip'),
+        (Opcode.SETI, '>1', '_', 'ip'),
+    ]
+    IP_VALUE = 14
+
+    def source(self, reg):
+        i, j, t, n, s = (reg(self.bindings[name]) for name in "ijtns")
+        return [f"{s} = {s} + divisor_sum({n})",
+                f"{i} = {j} = max({n}, 1) + 1",
+                f"{t} = 1"]
+
+
+class Division(Idiom):
+    """q = 0; while (q + 1) * d <= x: q += 1"""
+
+    TEMPLATE = [
+        (Opcode.SETI, 0, '_', 'q'),
+        (Opcode.ADDI, 'q', 1, 'u'),
+        (Opcode.MULI, 'u', '#d', 'u'),
+        (Opcode.GTRR, 'u', 'x', 'u'),
+        (Opcode.ADDR, 'u', 'ip', 'ip'),
+        (Opcode.ADDI, 'ip', 1, 'ip'),
+        (Opcode.SETI, '>9', '_', 'ip'),
+        (Opcode.ADDI, 'q', 1, 'q'),
+        (Opcode.SETI, '>1', '_', 'ip'),
+    ]
+    IP_VALUE = 8
+
+    @classmethod
+    def applies(cls, bindings):
+        return bindings['#d'] > 0
+
+    def source(self, reg):
+        q, u, x = (reg(self.bindings[name]) for name in "qux")
+        return [f"{q} = max(0, {x} // {self.bindings['#d']})",
+                f"{u} = 1"]
+
+
+IDIOMS = [DivisorSum, Division]
+
+
+def find_idioms(program, ip_register):
+    if ip_register is None:
+        return {}
+    found = {}
+    for idiom in IDIOMS:
+        found.update(idiom.find(program, ip_register))
+    return found
+
+
+class Compiler:
+    """Translates a program into a single python function.
+
+    Registers live in local variables and every possible entry point gets the straight-line code of the
+    instructions up to the next jump, so the dispatch on ip happens once per basic block instead of
+    once per instruction. Reads of the ip register inside a block are replaced by constants and loops
+    matching one of the IDIOMS are replaced by their native code when entered at the first instruction.
+    """
+
+    BLOCK_LIMIT = 64
+
+    def __init__(self, program, ip_register, registers, breakpoints=(), hooks=(), watches=(), accelerate=True):
+        self.program = program
+        self.ip_register = ip_register
+        self.registers = registers
+        self.breakpoints = set(breakpoints)
+        self.hooks = set(hooks)
+        self.watches = set(watches)
+        self.idioms = self.usable_idioms() if accelerate else {}
+        self.lines = []
+
+    def usable_idioms(self):
+        idioms = {}
+        for start, idiom in find_idioms(self.program, self.ip_register).items():
+            inside = range(start + 1, start + len(idiom))
+            if any(ip in inside for ip in self.breakpoints | self.hooks):
+                continue
+            if any(reg in self.watches for reg in idiom.registers()):
+                continue
+            idioms[start] = idiom
+        return idioms
+
+    def reg(self, idx):
+        if not 0 <= idx < self.registers:
+            raise ValueError(f"Register {idx} out of range")
+        return f"r{idx}"
+
+    def all_regs(self):
+        return ", ".join(self.reg(idx) for idx in range(self.registers))
+
+    def operand(self, value, kind, ip):
+        if kind == '-':
+            return ""
+        if kind == 'i':
+            return str(value)
+        if value == self.ip_register:
+            return str(ip)
+        return self.reg(value)
+
+    def block_end(self, start, ip):
+        if ip == start:
+            return False
+        return ip in self.breakpoints or ip in self.hooks or ip in self.idioms or ip % self.BLOCK_LIMIT == 0
+
+    def entries(self):
+        if self.ip_register is not None:
+            return list(range(len(self.program)))
+        # without an ip register the program only runs forward: it starts at 0, stops at breakpoints
+        # and hooks, continues after a watch and blocks are cut at multiples of the limit
+        entries = {0} | self.breakpoints | self.hooks
+        entries.update(range(0, len(self.program), self.BLOCK_LIMIT))
+        entries.update(ip + 1 for ip, (_, _, _, c) in enumerate(self.program) if c in self.watches)
+        return sorted(ip for ip in entries if 0 <= ip < len(self.program))
+
+    def emit(self, indent, line):
+        self.lines.append("    " * indent + line)
+
+    def emit_jump(self, indent, value):
+        # value is the new content of the ip register, the next instruction is the one after it
+        if self.ip_register is not None:
+            if value != self.reg(self.ip_register):
+                self.emit(indent, f"{self.reg(self.ip_register)} = {value}")
+            self.emit(indent, f"ip = {self.reg(self.ip_register)} + 1")
+        else:
+            self.emit(indent, f"ip = {value} + 1")
+
+    def emit_block(self, indent, start):
+        if start in self.breakpoints:
+            self.emit(indent, "break")
+            return
+        if start in self.hooks:
+            if self.ip_register is not None:
+                # the interpreter writes the ip to its register before each instruction, hooks see the same
+                self.emit(indent, f"{self.reg(self.ip_register)} = {start}")
+            self.emit(indent, f"regs = [{self.all_regs()}]")
+            self.emit(indent, f"stop = hooks[{start}](regs)")
+            self.emit(indent, f"{self.all_regs()}, = regs")
+            self.emit(indent, "if stop:")
+            self.emit(indent + 1, "break")
+        if start in self.idioms:
+            idiom = self.idioms[start]
+            for line in idiom.source(self.reg):
+                self.emit(indent, line)
+            self.emit_jump(indent, start + idiom.IP_VALUE)
+            return
+        ip = start
+        while True:
+            opcode, a, b, c = self.program[ip]
+            source, kinds = SOURCES[opcode]
+            expression = source.format(a=self.operand(a, kinds[0], ip), b=self.operand(b, kinds[1], ip))
+            self.emit(indent, f"{self.reg(c)} = {expression}")
+            executed = ip - start + 1
+            jump = c == self.ip_register
+            if c in self.watches:
+                self.emit(indent, f"if watches[{c}]({ip}, {self.reg(c)}):")
+                self.emit(indent + 1, f"count += {executed}")
+                self.emit_jump(indent + 1, self.reg(c) if jump else ip)
+                self.emit(indent + 1, "break")
+            ip += 1
+            if jump or ip >= len(self.program) or self.block_end(start, ip):
+                self.emit(indent, f"count += {executed}")
+                self.emit_jump(indent, self.reg(c) if jump else ip - 1)
+                return
+
+    def emit_dispatch(self, indent, entries):
+        if len(entries) == 1:
+            self.emit(indent, f"# ip == {entries[0]}")
+            self.emit_block(indent, entries[0])
+            return
+        middle = len(entries) // 2
+        self.emit(indent, f"if ip < {entries[middle]}:")
+        self.emit_dispatch(indent + 1, entries[:middle])
+        self.emit(indent, "else:")
+        self.emit_dispatch(indent + 1, entries[middle:])
+
+    def source(self):
+        self.lines = []
+        self.emit(0, "def run(reg, ip, hooks, watches):")
+        self.emit(1, f"{self.all_regs()}, = reg")
+        self.emit(1, "count = 0")
+        self.emit(1, f"while 0 <= ip < {len(self.program)}:")
+        self.emit_dispatch(2, self.entries())
+        self.emit(1, f"reg[:] = [{self.all_regs()}]")
+        self.emit(1, "return count, ip")
+        return "\n".join(self.lines)
+
+    def compile(self):
+        namespace = {"divisor_sum": divisor_sum}
+        exec(compile(self.source(), "<elfcode>", "exec"), namespace)
+        return namespace["run"]
+
+
+class Computer:
+    """Compiled program with optional breakpoints, hooks called with the registers before an instruction
+    is executed and register watches called with (ip, value) after a register is written.
+    A hook or watch returning a true value stops the computer.
+    Instructions of accelerated loops are not included in the count."""
+
+    def __init__(self, program, ip_register, registers=6, breakpoints=(), hooks=None, watches=None,
+                 accelerate=True):
+        self.program = program
+        self.ip_register = ip_register
+        self.hooks = hooks or {}
+        self.watches = watches or {}
+        compiler = Compiler(program, ip_register, registers, breakpoints, self.hooks.keys(), self.watches.keys(),
+                            accelerate)
+        self._run = compiler.compile()
+        self.ip = 0
+        self.exec_counter = 0
+
+    def run(self, reg, ip=0):
+        count, self.ip = self._run(reg, ip, self.hooks, self.watches)
+        self.exec_counter += count
+        return count
+
+    def halted(self):
+        return not 0 <= self.ip < len(self.program)
+
+
+def simulate_computer(program, ip_register, reg, ip_break=None, accelerate=True):
+    breakpoints = [] if ip_break is None else [ip_break]
+    computer = Computer(program, ip_register, len(reg), breakpoints, accelerate=accelerate)
+    return computer.run(reg)
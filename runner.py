@@ -0,0 +1,146 @@
+import argparse
+import importlib
+import inspect
+import os
+import re
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import cpu_count
+from pathlib import Path
+
+import inputs
+
+DAY_PATTERN = re.compile(r"day_?(?P<day>\d+)\.py", re.IGNORECASE)
+PART_NAMES = [('part1', 'part2'), ('part_1', 'part_2')]
+
+
+def find_days():
+    days = {}
+    for path in Path(__file__).parent.glob("*.py"):
+        match = DAY_PATTERN.fullmatch(path.name)
+        if match is not None:
+            days[int(match.group("day"))] = path.stem
+    return dict(sorted(days.items()))
+
+
+def takes_input(function):
+    params = inspect.signature(function).parameters.values()
+    required = [p.name for p in params if p.default is inspect.Parameter.empty]
+    return required in ([], ['input_data'])
+
+
+def get_parts(module):
+    """Maps part names ('a', 'b' or 'ab' when both are solved together) to a zero argument callable."""
+    for name_a, name_b in PART_NAMES:
+        part_a = getattr(module, name_a, None)
+        part_b = getattr(module, name_b, None)
+        if part_a is None or part_b is None:
+            continue
+        if not takes_input(part_a) or not takes_input(part_b):
+            continue
+        return {'a': bind_input(module, part_a), 'b': bind_input(module, part_b)}
+    for name in ['solve', 'main']:
+        if hasattr(module, name):
+            return {'ab': getattr(module, name)}
+    raise RuntimeError(f"No entry point in {module.__name__}")
+
+
+def bind_input(module, function):
+    if 'input_data' in inspect.signature(function).parameters:
+        return lambda: function(module.puzzle.input_data)
+    return function
+
+
+def init_worker():
+    inputs.SUBMIT = False
+    # the solutions print boards and progress, only the table is interesting here
+    sys.stdout = open(os.devnull, "w")
+
+
+def run_part(task, input_data=None):
+    day, module_name, part = task
+    result = {'day': day, 'part': part, 'answers': {}, 'error': None}
+    try:
+        module = importlib.import_module(module_name)
+        function = get_parts(module)[part]
+        if input_data is not None:
+            module.puzzle.input_data = input_data
+        module.puzzle.input_data  # input loading is not part of the measurement
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        children_start = resource.getrusage(resource.RUSAGE_CHILDREN)
+        answer = function()
+        result['wall'] = time.perf_counter() - wall_start
+        # process pools started by the solution count once their workers have been joined
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        children_cpu = (children.ru_utime + children.ru_stime
+                        - children_start.ru_utime - children_start.ru_stime)
+        result['cpu'] = time.process_time() - cpu_start + children_cpu
+        result['answers'] = dict(module.puzzle.answers)
+        if answer is not None and len(part) == 1:
+            result['answers'][part] = answer
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+              resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    result['rss'] = rss / 1024
+    return result
+
+
+def collect_tasks(days, parts):
+    tasks = []
+    for day, module_name in find_days().items():
+        if days and day not in days:
+            continue
+        try:
+            module_parts = get_parts(importlib.import_module(module_name))
+        except Exception as e:
+            print(f"Skipping day {day}: {type(e).__name__}: {e}")
+            continue
+        for part in module_parts:
+            if any(p in part for p in parts):
+                tasks.append((day, module_name, part))
+    return tasks
+
+
+def print_table(results):
+    print(f"{'day':>3} {'part':>4} {'wall [s]':>10} {'cpu [s]':>10} {'rss [MB]':>9}  answer")
+    for r in results:
+        if r['error'] is not None:
+            print(f"{r['day']:>3} {r['part']:>4} {'-':>10} {'-':>10} {r['rss']:>9.1f}  {r['error']}")
+            continue
+        answers = ', '.join(f"{p}={a}" for p, a in sorted(r['answers'].items()))
+        print(f"{r['day']:>3} {r['part']:>4} {r['wall']:>10.3f} {r['cpu']:>10.3f} {r['rss']:>9.1f}  {answers}")
+
+
+def submit(results):
+    for r in results:
+        puzzle = inputs.LazyPuzzle(year=2018, day=r['day'])
+        for part, answer in sorted(r['answers'].items()):
+            print(f"Submitting day {r['day']} part {part}: {answer}")
+            puzzle.submit(part, answer)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run and time the 2018 solutions")
+    parser.add_argument("days", nargs="*", type=int, help="days to run, all when empty")
+    parser.add_argument("--parts", default="ab", help="parts to run, e.g. 'a' or 'ab'")
+    parser.add_argument("--jobs", type=int, default=cpu_count(), help="number of worker processes")
+    parser.add_argument("--submit", action="store_true", help="submit the answers after all parts finished")
+    args = parser.parse_args()
+
+    inputs.SUBMIT = False
+    tasks = collect_tasks(set(args.days), args.parts)
+    # a fresh process per part keeps the peak RSS of one part from leaking into the next,
+    # unlike multiprocessing.Pool the workers are not daemonic so solutions can start their own pools
+    with ProcessPoolExecutor(args.jobs, initializer=init_worker, max_tasks_per_child=1) as pool:
+        results = list(pool.map(run_part, tasks))
+    print_table(results)
+    if args.submit:
+        submit([r for r in results if r['error'] is None])
+
+
+if __name__ == '__main__':
+    main()